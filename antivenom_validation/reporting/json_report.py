@@ -4,15 +4,21 @@ Geração de relatório JSON.
 
 import json
 from pathlib import Path
-from typing import Union
+from typing import Any, Union
 from datetime import datetime
 
 from validate.models import ValidationReport
 
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
 
 def generate_json_report(
     report: ValidationReport,
-    output_dir: Union[str, Path]
+    output_dir: Union[str, Path],
+    timestamp: str = None
 ) -> Path:
     """
     Gera relatório JSON completo.
@@ -20,6 +26,7 @@ def generate_json_report(
     Args:
         report: Relatório de validação
         output_dir: Diretório de saída
+        timestamp: Timestamp do nome do arquivo (padrão: agora)
         
     Returns:
         Caminho do arquivo gerado
@@ -28,20 +35,35 @@ def generate_json_report(
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Nome do arquivo com timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"validation_report_{timestamp}.json"
     output_path = output_dir / filename
     
-    # Converter para dict
-    report_dict = report.to_dict()
+    # Converter para dict (com orjson, os resultados são serializados direto das dataclasses)
+    report_dict = report.to_dict(convert_results=orjson is None)
     
     # Escrever arquivo
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(report_dict, f, indent=2, ensure_ascii=False, default=str)
+    output_path.write_bytes(dumps_json(report_dict))
     
     return output_path
 
 
+def dumps_json(data: Any) -> bytes:
+    """
+    Serializa para JSON indentado (UTF-8).
+    
+    Usa `orjson` quando instalado e recorre à biblioteca padrão caso contrário.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
+
 def load_json_report(file_path: Union[str, Path]) -> dict:
     """Carrega relatório JSON."""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -53,20 +75,24 @@ def merge_reports(reports: list) -> dict:
     if not reports:
         return {}
     
+    # Uma única passada sobre os relatórios e seus resultados
+    all_passed = True
+    total_errors = 0
+    total_warnings = 0
+    for r in reports:
+        all_passed = all_passed and bool(r.get('passed', False))
+        for res in r.get('results', ()):
+            total_errors += len(res.get('errors', ()))
+            total_warnings += len(res.get('warnings', ()))
+    
     merged = {
         "merged_at": datetime.now().isoformat(),
         "report_count": len(reports),
         "reports": reports,
         "summary": {
-            "all_passed": all(r.get('passed', False) for r in reports),
-            "total_errors": sum(
-                sum(len(res.get('errors', [])) for res in r.get('results', []))
-                for r in reports
-            ),
-            "total_warnings": sum(
-                sum(len(res.get('warnings', [])) for res in r.get('results', []))
-                for r in reports
-            )
+            "all_passed": all_passed,
+            "total_errors": total_errors,
+            "total_warnings": total_warnings
         }
     }
     
@@ -2,16 +2,53 @@
 Geração de relatórios Markdown (um por check).
 """
 
+import io
 from pathlib import Path
 from typing import Union, List, Dict, Any
 from datetime import datetime
 
 from validate.models import ValidationReport, ValidationResult, ValidationError, Severity
 
+from .json_report import dumps_json
+from .writer import write_file, write_files
+
+
+# Modos de geração dos arquivos por check
+DETAILED_MODES = ('all', 'failed', 'none')
+
+# Badge de severidade
+_SEVERITY_BADGES = {
+    'BLOCKER': '🔴 **BLOCKER**',
+    'MAJOR': '🟠 **MAJOR**',
+    'MINOR': '🟡 **MINOR**',
+    'INFO': '🔵 **INFO**'
+}
+
+# Trechos fixos do sumário (montados uma única vez, na importação)
+_SUMMARY_HEADER = "# 📋 Relatório de Validação - Sumário\n\n"
+_METRICS_HEADER = (
+    "\n---\n\n"
+    "## 📊 Resumo\n\n"
+    "| Métrica | Valor |\n"
+    "|---------|-------|\n"
+)
+_CHECKS_HEADER = (
+    "\n---\n\n"
+    "## 📝 Checks Executados\n\n"
+    "| Check | Status | Erros | Warnings | Tempo |\n"
+    "|-------|--------|-------|----------|-------|\n"
+)
+_DETAILS_HEADER = "\n---\n\n## 🔍 Detalhes por Check\n\n"
+
+# Linha da tabela de checks no sumário
+_SUMMARY_ROW = "| {category} | {emoji} | {errors} | {warnings} | {time:.3f}s |\n"
+
 
 def generate_markdown_reports(
     report: ValidationReport,
-    output_dir: Union[str, Path]
+    output_dir: Union[str, Path],
+    timestamp: str = None,
+    detailed: str = 'failed'
 ) -> List[Path]:
     """
     Gera relatórios Markdown individuais para cada check.
@@ -19,32 +56,46 @@ def generate_markdown_reports(
     Args:
         report: Relatório de validação
         output_dir: Diretório de saída
+        timestamp: Timestamp dos nomes de arquivo (padrão: agora)
+        detailed: Checks com arquivo próprio: 'all' (todos), 'failed'
+            (somente os que falharam) ou 'none'. O sumário é sempre gerado.
         
     Returns:
         Lista de caminhos dos arquivos gerados
     """
+    if detailed not in DETAILED_MODES:
+        raise ValueError(f"Modo 'detailed' inválido: {detailed} (esperado: {', '.join(DETAILED_MODES)})")
+    
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
     generated_files = []
+    pending = []
+    buf = io.StringIO()  # reutilizado por todos os checks
     
-    # Gerar um arquivo para cada check
+    # Gerar um arquivo para cada check (conforme `detailed`)
     for result in report.results:
+        if detailed == 'none' or (detailed == 'failed' and (result.passed or result.skipped)):
+            continue
+        
         filename = f"check_{result.category}_{timestamp}.md"
         output_path = output_dir / filename
         
-        content = _generate_check_markdown(result, report)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        content = _generate_check_markdown(result, report, buf)
+        pending.append((output_path, content.encode('utf-8')))
         
         generated_files.append(output_path)
     
-    # Gerar sumário geral
-    summary_path = generate_markdown_summary(report, output_dir, timestamp)
+    # Gerar sumário geral (escrito no mesmo lote dos checks)
+    summary_path = output_dir / f"validation_summary_{timestamp}.md"
+    pending.append((summary_path, _generate_summary_markdown(report).encode('utf-8')))
     generated_files.append(summary_path)
     
+    write_files(pending)
+    
     return generated_files
 
 
@@ -64,153 +115,150 @@ def generate_markdown_summary(
     output_path = output_dir / filename
     
     content = _generate_summary_markdown(report)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    write_file(output_path, content.encode('utf-8'))
     
     return output_path
 
 
-def _generate_check_markdown(result: ValidationResult, report: ValidationReport) -> str:
-    """Gera conteúdo Markdown para um check específico."""
-    status = "✅ PASSOU" if result.passed else "❌ FALHOU"
-    
-    lines = [
-        f"# Check: {result.category}",
-        "",
-        f"**Status:** {status}",
-        f"**Executado em:** {report.timestamp}",
-        f"**Arquivo:** `{report.file_path}`",
-        "",
-        "---",
-        ""
-    ]
+def _generate_check_markdown(
+    result: ValidationResult,
+    report: ValidationReport,
+    buf: io.StringIO = None
+) -> str:
+    """
+    Gera conteúdo Markdown para um check específico.
+    
+    `buf` permite reutilizar o mesmo buffer entre checks (é esvaziado a cada chamada).
+    """
+    if buf is None:
+        buf = io.StringIO()
+    else:
+        buf.seek(0)
+        buf.truncate()
+    w = buf.write
+    
+    if result.skipped:
+        status = "⏭️ NÃO EXECUTADO"
+    else:
+        status = "✅ PASSOU" if result.passed else "❌ FALHOU"
+    
+    w(f"# Check: {result.category}\n\n")
+    w(f"**Status:** {status}\n")
+    w(f"**Executado em:** {report.timestamp}\n")
+    w(f"**Arquivo:** `{report.file_path}`\n")
+    w("\n---\n\n")
     
     # Erros
     if result.errors:
-        lines.append("## ❌ Erros")
-        lines.append("")
+        w("## ❌ Erros\n\n")
         for i, error in enumerate(result.errors, 1):
-            lines.extend(_format_error(error, i))
-        lines.append("")
+            _write_error(w, error, i)
+        w("\n")
     
     # Warnings
     if result.warnings:
-        lines.append("## ⚠️ Warnings")
-        lines.append("")
+        w("## ⚠️ Warnings\n\n")
         for i, warning in enumerate(result.warnings, 1):
-            lines.extend(_format_error(warning, i))
-        lines.append("")
+            _write_error(w, warning, i)
+        w("\n")
     
     # Info
     if result.info:
-        lines.append("## ℹ️ Informações")
-        lines.append("")
+        w("## ℹ️ Informações\n\n")
         for i, info in enumerate(result.info, 1):
-            lines.extend(_format_error(info, i))
-        lines.append("")
+            _write_error(w, info, i)
+        w("\n")
     
     # Tempo de execução
     execution_time = getattr(result, 'execution_time', None) or getattr(result, 'duration_seconds', None)
     if execution_time:
-        lines.extend([
-            "---",
-            "",
-            f"**Tempo de execução:** {execution_time:.4f}s",
-            ""
-        ])
-    
-    return "\n".join(lines)
+        w("---\n\n")
+        w(f"**Tempo de execução:** {execution_time:.4f}s\n\n")
+    
+    # Cada linha foi escrita com "\n"; a última quebra não faz parte do conteúdo
+    return buf.getvalue()[:-1]
 
 
 def _generate_summary_markdown(report: ValidationReport) -> str:
     """Gera conteúdo Markdown do sumário."""
-    status = "✅ PASSOU" if report.passed else "❌ FALHOU"
-    
     # Contar estatísticas
     total_errors = sum(len(r.errors) for r in report.results)
     total_warnings = sum(len(r.warnings) for r in report.results)
     total_info = sum(len(r.info) for r in report.results)
     passed_checks = sum(1 for r in report.results if r.passed)
-    failed_checks = len(report.results) - passed_checks
-    
-    lines = [
-        "# 📋 Relatório de Validação - Sumário",
-        "",
-        f"**Status Geral:** {status}",
-        f"**Executado em:** {report.timestamp}",
-        f"**Arquivo:** `{report.file_path}`",
-        f"**Linhas:** {report.total_rows:,}",
-        f"**Colunas:** {report.total_columns}",
-        "",
-        "---",
-        "",
-        "## 📊 Resumo",
-        "",
-        "| Métrica | Valor |",
-        "|---------|-------|",
-        f"| Checks executados | {len(report.results)} |",
-        f"| Passou | {passed_checks} |",
-        f"| Falhou | {failed_checks} |",
-        f"| Total de erros | {total_errors} |",
-        f"| Total de warnings | {total_warnings} |",
-        f"| Total de info | {total_info} |",
-        f"| Tempo total | {report.execution_time:.3f}s |",
-        "",
-        "---",
-        "",
-        "## 📝 Checks Executados",
-        "",
-        "| Check | Status | Erros | Warnings | Tempo |",
-        "|-------|--------|-------|----------|-------|"
-    ]
+    skipped_checks = sum(1 for r in report.results if r.skipped)
+    failed_checks = len(report.results) - passed_checks - skipped_checks
+    
+    if report.passed:
+        status = "✅ PASSOU"
+    elif failed_checks == 0:
+        status = "⚠️ INCOMPLETO"  # nenhum check falhou, mas algum não foi executado
+    else:
+        status = "❌ FALHOU"
+    
+    buf = io.StringIO()
+    w = buf.write
+    
+    w(_SUMMARY_HEADER)
+    w(f"**Status Geral:** {status}\n")
+    w(f"**Executado em:** {report.timestamp}\n")
+    w(f"**Arquivo:** `{report.file_path}`\n")
+    w(f"**Linhas:** {report.total_rows:,}\n")
+    w(f"**Colunas:** {report.total_columns}\n")
+    w(_METRICS_HEADER)
+    w(f"| Checks executados | {len(report.results)} |\n")
+    w(f"| Passou | {passed_checks} |\n")
+    w(f"| Falhou | {failed_checks} |\n")
+    if skipped_checks:
+        w(f"| Não executados | {skipped_checks} |\n")
+    w(f"| Total de erros | {total_errors} |\n")
+    w(f"| Total de warnings | {total_warnings} |\n")
+    w(f"| Total de info | {total_info} |\n")
+    w(f"| Tempo total | {report.execution_time:.3f}s |\n")
+    w(_CHECKS_HEADER)
     
     for result in report.results:
-        status_emoji = "✅" if result.passed else "❌"
-        time_str = f"{getattr(result, 'execution_time', getattr(result, 'duration_seconds', 0)):.3f}s"
-        lines.append(
-            f"| {result.category} | {status_emoji} | {len(result.errors)} | {len(result.warnings)} | {time_str} |"
-        )
-    
-    lines.extend([
-        "",
-        "---",
-        "",
-        "## 🔍 Detalhes por Check",
-        ""
-    ])
+        w(_SUMMARY_ROW.format(
+            category=result.category,
+            emoji=_status_emoji(result),
+            errors=len(result.errors),
+            warnings=len(result.warnings),
+            time=getattr(result, 'execution_time', getattr(result, 'duration_seconds', 0))
+        ))
+    
+    w(_DETAILS_HEADER)
     
     for result in report.results:
-        status_emoji = "✅" if result.passed else "❌"
-        lines.append(f"### {status_emoji} {result.category}")
-        lines.append("")
+        w(f"### {_status_emoji(result)} {result.category}\n\n")
         
-        if not result.passed:
-            lines.append("**Principais problemas:**")
-            lines.append("")
+        if result.skipped:
+            w("Não executado.\n\n")
+        elif not result.passed:
+            w("**Principais problemas:**\n\n")
             for error in result.errors[:3]:  # Top 3 erros
                 msg = error.message if hasattr(error, 'message') else error.get('message', '')
-                lines.append(f"- {msg}")
+                w(f"- {msg}\n")
             if len(result.errors) > 3:
-                lines.append(f"- ... e mais {len(result.errors) - 3} erros")
-            lines.append("")
+                w(f"- ... e mais {len(result.errors) - 3} erros\n")
+            w("\n")
         else:
-            lines.append("Nenhum erro encontrado.")
-            lines.append("")
+            w("Nenhum erro encontrado.\n\n")
     
-    lines.extend([
-        "---",
-        "",
-        f"**Relatório gerado em:** {datetime.now()}",
-    ])
+    w("---\n\n")
+    w(f"**Relatório gerado em:** {datetime.now()}")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
-def _format_error(error: Union[ValidationError, dict], index: int) -> List[str]:
-    """Formata um erro/warning/info para Markdown."""
-    lines = []
-    
+def _status_emoji(result: ValidationResult) -> str:
+    """Emoji de status de um check: aprovado, não executado ou falhou."""
+    if result.passed:
+        return "✅"
+    return "⏭️" if result.skipped else "❌"
+
+
+def _write_error(w, error: Union[ValidationError, dict], index: int) -> None:
+    """Escreve um erro/warning/info em Markdown usando a função de escrita `w`."""
     # Extrair campos (suporta dict ou ValidationError)
     if isinstance(error, dict):
         severity = error.get('severity', 'UNKNOWN')
@@ -223,37 +271,22 @@ def _format_error(error: Union[ValidationError, dict], index: int) -> List[str]:
         row_indices = error.row_indices or []
         details = error.details or {}
     
-    # Badge de severidade
-    severity_badges = {
-        'BLOCKER': '🔴 **BLOCKER**',
-        'MAJOR': '🟠 **MAJOR**',
-        'MINOR': '🟡 **MINOR**',
-        'INFO': '🔵 **INFO**'
-    }
-    badge = severity_badges.get(str(severity), f'**{severity}**')
+    badge = _SEVERITY_BADGES.get(str(severity), f'**{severity}**')
     
-    lines.append(f"### {index}. {badge}")
-    lines.append("")
-    lines.append(f"**Mensagem:** {message}")
-    lines.append("")
+    w(f"### {index}. {badge}\n\n")
+    w(f"**Mensagem:** {message}\n\n")
     
     if row_indices:
         rows_display = row_indices[:10]
-        lines.append(f"**Linhas afetadas:** {rows_display}")
+        w(f"**Linhas afetadas:** {rows_display}\n")
         if len(row_indices) > 10:
-            lines.append(f"  *(... e mais {len(row_indices) - 10} linhas)*")
-        lines.append("")
+            w(f"  *(... e mais {len(row_indices) - 10} linhas)*\n")
+        w("\n")
     
     if details:
-        lines.append("<details>")
-        lines.append("<summary>📋 Detalhes</summary>")
-        lines.append("")
-        lines.append("```json")
-        import json
-        lines.append(json.dumps(details, indent=2, ensure_ascii=False, default=str))
-        lines.append("```")
-        lines.append("")
-        lines.append("</details>")
-        lines.append("")
-    
-    return lines
+        w("<details>\n")
+        w("<summary>📋 Detalhes</summary>\n\n")
+        w("```json\n")
+        w(dumps_json(details).decode('utf-8'))
+        w("\n```\n\n")
+        w("</details>\n\n")
@@ -5,6 +5,7 @@ Uso: python run.py [arquivo_xlsx]
 """
 
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Adicionar diretório ao path
@@ -40,9 +41,10 @@ def main():
     reports_dir = Path("reports")
     reports_dir.mkdir(exist_ok=True)
     
-    # Gerar relatórios
-    json_path = generate_json_report(report, reports_dir)
-    md_paths = generate_markdown_reports(report, reports_dir)
+    # Gerar relatórios (mesmo timestamp para todos os arquivos da execução)
+    run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = generate_json_report(report, reports_dir, timestamp=run_ts)
+    md_paths = generate_markdown_reports(report, reports_dir, timestamp=run_ts, detailed='failed')
     
     # Mostrar resumo
     stats = get_summary_stats(report)
@@ -0,0 +1,55 @@
+"""
+Equivalência entre a validação em blocos (`run_chunks`) e a execução completa.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from validate.checks.coherence import CoherenceCheck
+from validate.manifest import ManifestConfig
+from validate.runner import ValidationRunner, iter_csv_chunks
+
+
+def make_coherence_df(n_rows: int = 3000, seed: int = 1) -> pd.DataFrame:
+    """Dataset com muitos tipos de inconsistência FU ↔ Federal_Un e Region ↔ FU."""
+    rng = np.random.default_rng(seed)
+    fu_to_state = CoherenceCheck.DEFAULT_FU_STATE_MAPPING
+    region_by_fu = CoherenceCheck.DEFAULT_REGION_BY_FU
+    
+    fus = rng.choice(list(fu_to_state), n_rows)
+    states = [states[0] for states in fu_to_state.values()]
+    regions = list(CoherenceCheck.DEFAULT_FU_REGION_MAPPING)
+    
+    return pd.DataFrame({
+        'FU': fus,
+        'Federal_Un': np.where(
+            rng.random(n_rows) < 0.9, [fu_to_state[fu][0] for fu in fus], rng.choice(states, n_rows)
+        ),
+        'Region': np.where(
+            rng.random(n_rows) < 0.9, [region_by_fu[fu] for fu in fus], rng.choice(regions, n_rows)
+        ),
+        'Atendiment': 'Botrópico, Crotálico',
+        'Atendime_1': rng.choice(['Botrópico', 'Botrópico, Crotálico'], n_rows)
+    })
+
+
+def result_dict(report, category: str) -> dict:
+    """Resultado de `category` no relatório, sem o tempo de execução."""
+    result = next(r for r in report.results if r.category == category).to_dict()
+    result.pop('duration_seconds')
+    return result
+
+
+@pytest.mark.parametrize('chunksize', [1_000_000, 700, 333, 50])
+def test_coherence_stream_matches_full_run(tmp_path, chunksize):
+    csv_path = tmp_path / 'coherence.csv'
+    make_coherence_df().to_csv(csv_path, index=False)
+    config = ManifestConfig(input_file=str(csv_path))
+    
+    full = ValidationRunner(config=config, checks=[CoherenceCheck]).run(pd.read_csv(csv_path))
+    streamed = ValidationRunner(config=config, checks=[CoherenceCheck]).run_chunks(
+        iter_csv_chunks(str(csv_path), config, chunksize)
+    )
+    
+    assert result_dict(streamed, 'coherence') == result_dict(full, 'coherence')
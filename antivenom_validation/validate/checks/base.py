@@ -2,8 +2,11 @@
 Classe base para todos os checks de validação.
 """
 
+import dataclasses
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Callable
 import pandas as pd
 import time
 
@@ -14,6 +17,28 @@ from ..manifest import ManifestConfig
 class BaseCheck(ABC):
     """Interface abstrata para checks de validação."""
     
+    # Sub-checks só rodam em paralelo a partir deste número de linhas
+    PARALLEL_MIN_ROWS = 50_000
+    MAX_SUBCHECK_WORKERS = 4
+    
+    # True se o check avalia cada linha isoladamente e pode rodar bloco a bloco
+    # (ver `ValidationRunner.run_chunks`, `run_chunk` e `merge_results`)
+    STREAMABLE = False
+    
+    # True se o check mede tempos (benchmarks) e deve rodar sozinho, fora do pool do runner
+    RUN_ALONE = False
+    
+    # Cache compartilhado pelos checks de uma mesma execução (definido pelo runner)
+    context: Optional[dict] = None
+    
+    # Desligado pelo runner quando o próprio check já roda em seu pool (sem pools aninhados)
+    parallel_subchecks = True
+    
+    def __init__(self):
+        # Limites de `row_indices`/`details` de cada tipo de achado (ver `create_error`)
+        self.finding_limits = {}
+        self.reset_stream()
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -39,10 +64,29 @@ class BaseCheck(ABC):
         column: Optional[str] = None,
         expected: Optional[any] = None,
         actual: Optional[any] = None,
-        details: Optional[dict] = None
+        details: Optional[dict] = None,
+        row_count: Optional[int] = None,
+        row_limit: Optional[int] = None,
+        detail_limits: Optional[dict[str, int]] = None
     ) -> ValidationError:
-        """Cria um erro de validação."""
-        return ValidationError(
+        """
+        Cria um erro de validação.
+        
+        Achados por linha informam `row_count`, acrescentado à mensagem como
+        "(N registros)"; o tipo do achado (severidade, coluna e `message`) e a
+        contagem ficam registrados para que `merge_row_results` junte os blocos
+        sem interpretar o texto. `row_limit` limita `row_indices`;
+        `detail_limits` informa o tamanho máximo das amostras em `details` (já
+        limitadas pelo check). Ambos valem para o tipo de achado ao juntar blocos.
+        """
+        key = (severity, column, message)
+        if row_count is not None:
+            message = row_count_message(message, row_count)
+        
+        if row_limit is not None and row_indices is not None:
+            row_indices = row_indices[:row_limit]
+        
+        error = ValidationError(
             severity=severity,
             category=self.name,
             message=message,
@@ -52,6 +96,14 @@ class BaseCheck(ABC):
             actual=actual,
             details=details
         )
+        
+        if row_count is not None:
+            # Guarda o próprio achado: seu id não é reutilizado enquanto registrado
+            self.row_findings[id(error)] = (error, key, row_count)
+            if row_limit is not None or detail_limits:
+                self.finding_limits[key] = {'row_indices': row_limit, **(detail_limits or {})}
+        
+        return error
     
     def validate_rows(
         self,
@@ -61,11 +113,30 @@ class BaseCheck(ABC):
         severity: Severity,
         column: Optional[str] = None
     ) -> list[ValidationError]:
-        """Valida linhas com base em uma condição."""
+        """
+        Valida linhas com base em uma condição avaliada linha a linha (`df.apply`).
+        
+        Condições vetorizáveis devem usar `validate_mask`.
+        """
+        if df.empty:
+            return []
+        
+        mask = df.apply(condition_func, axis=1).astype(bool)
+        return self.validate_mask(df, lambda _: mask, error_message, severity, column)
+    
+    def validate_mask(
+        self,
+        df: pd.DataFrame,
+        mask_func: Callable[[pd.DataFrame], pd.Series],
+        error_message: str,
+        severity: Severity,
+        column: Optional[str] = None
+    ) -> list[ValidationError]:
+        """Valida linhas com uma máscara booleana vetorizada (True = linha válida)."""
         errors = []
         
-        invalid_mask = ~df.apply(condition_func, axis=1)
-        invalid_indices = df[invalid_mask].index.tolist()
+        invalid_mask = ~mask_func(df).astype(bool)
+        invalid_indices = df.index[invalid_mask.to_numpy()].tolist()
         
         if invalid_indices:
             errors.append(self.create_error(
@@ -77,9 +148,150 @@ class BaseCheck(ABC):
         
         return errors
     
-    def timed_run(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
-        """Executa a validação medindo o tempo."""
-        start = time.time()
-        result = self.run(df, config)
-        result.duration_seconds = time.time() - start
+    def run_subchecks(self, df: pd.DataFrame, tasks: list[Callable[[], Any]]) -> list:
+        """
+        Executa sub-checks independentes (somente leitura sobre `df`).
+        
+        Em DataFrames grandes usa um pool de threads, já que os kernels do
+        pandas/NumPy liberam o GIL; os resultados seguem a ordem de `tasks`.
+        """
+        if not self.parallel_subchecks or len(tasks) < 2 or len(df) < self.PARALLEL_MIN_ROWS:
+            return [task() for task in tasks]
+        
+        with ThreadPoolExecutor(max_workers=min(self.MAX_SUBCHECK_WORKERS, len(tasks))) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            return [future.result() for future in futures]
+    
+    def deep_memory_usage(self, df: pd.DataFrame) -> pd.Series:
+        """`df.memory_usage(deep=True)`, calculado uma única vez por execução do runner."""
+        if self.context is None:
+            return df.memory_usage(deep=True)
+        
+        # Checks do mesmo pool esperam o primeiro cálculo em vez de repeti-lo
+        with self.context.setdefault('lock', threading.Lock()):
+            cached = self.context.get('memory_usage')
+            if cached is None or cached[0] is not df:
+                cached = (df, df.memory_usage(deep=True))
+                self.context['memory_usage'] = cached
+        return cached[1]
+    
+    def reset_stream(self) -> None:
+        """
+        Descarta o estado acumulado por `run_chunk`. Chamado na criação do check
+        e pelo runner antes de cada execução em blocos, para que reutilizar a
+        instância não conte linhas duas vezes.
+        """
+        # Achados por linha criados com `row_count`: id -> (achado, tipo, contagem)
+        self.row_findings = {}
+    
+    def run_chunk(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        """Executa a validação sobre um bloco de linhas (modo streaming). Padrão: `run`."""
+        return self.run(df, config)
+    
+    def merge_results(self, results: list[ValidationResult], config: ManifestConfig) -> ValidationResult:
+        """Combina os resultados de `run_chunk` de todos os blocos. Padrão: concatena os achados."""
+        return ValidationResult.merge(results)
+    
+    def merge_row_results(self, results: list[ValidationResult]) -> ValidationResult:
+        """`ValidationResult.merge` juntando achados equivalentes dos blocos (`merge_row_findings`)."""
+        merged = ValidationResult.merge(results)
+        merged.errors = self.merge_row_findings(merged.errors)
+        merged.warnings = self.merge_row_findings(merged.warnings)
+        merged.info = self.merge_row_findings(merged.info)
+        return merged
+    
+    def merge_row_findings(self, findings: list) -> list:
+        """
+        Junta achados equivalentes de blocos diferentes (modo streaming).
+        
+        Achados do mesmo tipo registrado por `create_error` viram um só, na
+        posição do primeiro: contagens somadas, `row_indices` concatenados e
+        `details` combinados (ver `_merge_details`), até os limites do tipo em
+        `finding_limits`. Os demais achados são mantidos como estão.
+        """
+        groups = {}
+        ordered = []
+        for finding in findings:
+            entry = self.row_findings.get(id(finding))
+            if entry is None or entry[0] is not finding:
+                ordered.append((None, [finding]))
+                continue
+            
+            _, key, count = entry
+            if key not in groups:
+                groups[key] = []
+                ordered.append((key, groups[key]))
+            groups[key].append((finding, count))
+        
+        return [
+            group[0] if key is None
+            else group[0][0] if len(group) == 1
+            else _merge_row_group(group, key[2], self.finding_limits.get(key, {}))
+            for key, group in ordered
+        ]
+    
+    def timed_run(self, df: pd.DataFrame, config: ManifestConfig, chunk: bool = False) -> ValidationResult:
+        """Executa a validação medindo o tempo (`chunk=True`: via `run_chunk`)."""
+        start = time.perf_counter_ns()
+        result = self.run_chunk(df, config) if chunk else self.run(df, config)
+        result.duration_seconds = (time.perf_counter_ns() - start) / 1e9
         return result
+
+
+def _merge_row_group(group: list[tuple[ValidationError, int]], message: str, limits: dict) -> ValidationError:
+    """
+    Um único achado a partir dos pares (achado, contagem) equivalentes de vários
+    blocos; `message` é a mensagem do tipo, sem a contagem.
+    """
+    counts = [count for _, count in group]
+    indices = [f.row_indices or [] for f, _ in group]
+    
+    # Sem limite registrado, blocos com mais linhas que índices listados revelam o limite
+    row_limit = limits.get('row_indices')
+    if row_limit is None:
+        truncated = [len(idx) for idx, n in zip(indices, counts) if n > len(idx)]
+        row_limit = max(truncated) if truncated else None
+    row_indices = [i for idx in indices for i in idx][:row_limit]
+    
+    first = group[0][0]
+    return dataclasses.replace(
+        first,
+        message=row_count_message(message, sum(counts)),
+        row_indices=row_indices or first.row_indices,
+        details=_merge_details([f.details for f, _ in group], limits)
+    )
+
+
+def row_count_message(message: str, row_count: int) -> str:
+    """Mensagem de um achado por linha com a contagem, ex.: "CNES inválido (12 registros)"."""
+    return f"{message} ({row_count} registros)"
+
+
+def _merge_details(details: list[Optional[dict]], limits: dict) -> Optional[dict]:
+    """
+    Combina os `details` de achados equivalentes: inteiros somados, listas
+    (amostras) concatenadas e dicts de contagens somados por chave, ambos
+    limitados ao tamanho em `limits` (ou ao maior tamanho visto); demais
+    valores vêm do primeiro bloco.
+    """
+    present = [d for d in details if d]
+    if not present:
+        return details[0]
+    
+    merged = {}
+    for key in dict.fromkeys(k for d in present for k in d):
+        values = [d[key] for d in present if key in d]
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            merged[key] = sum(values)
+        elif all(isinstance(v, list) for v in values):
+            merged[key] = [item for v in values for item in v][:limits.get(key, max(map(len, values)))]
+        elif all(isinstance(v, dict) for v in values):
+            totals = {}
+            for v in values:
+                for label, n in v.items():
+                    totals[label] = totals.get(label, 0) + n
+            top = sorted(totals.items(), key=lambda item: -item[1])  # estável nos empates
+            merged[key] = dict(top[:limits.get(key, max(map(len, values)))])
+        else:
+            merged[key] = values[0]
+    return merged
@@ -2,17 +2,79 @@
 Validação de coerência entre campos.
 """
 
+import re
+import numpy as np
 import pandas as pd
-from typing import Optional
+from collections import Counter
+from typing import Mapping, Optional, Sequence
 
 from .base import BaseCheck
 from ..models import ValidationResult, ValidationError, Severity
-from ..manifest import ManifestConfig
+from ..manifest import ManifestConfig, load_mapping_yaml
+
+
+# Um item não vazio de uma lista separada por vírgulas
+NONEMPTY_ITEM_PATTERN = r'[^,\s][^,]*'
+_NONEMPTY_ITEM = re.compile(NONEMPTY_ITEM_PATTERN)
+
+# Colunas comparadas como categorias (códigos inteiros) nos checks de coerência
+CATEGORICAL_COLUMNS = ('FU', 'Federal_Un', 'Region')
 
 
 class CoherenceCheck(BaseCheck):
     """Valida coerência entre campos relacionados."""
     
+    STREAMABLE = True
+    
+    # Mapeamento padrão FU → Estado(s)
+    DEFAULT_FU_STATE_MAPPING = {
+        'AC': ['Acre'],
+        'AL': ['Alagoas'],
+        'AM': ['Amazonas'],
+        'AP': ['Amapá'],
+        'BA': ['Bahia'],
+        'CE': ['Ceará'],
+        'DF': ['Distrito Federal'],
+        'ES': ['Espírito Santo', 'Espiríto Santo'],
+        'GO': ['Goiás'],
+        'MA': ['Maranhão'],
+        'MG': ['Minas Gerais'],
+        'MS': ['Mato Grosso do Sul'],
+        'MT': ['Mato Grosso'],
+        'PA': ['Pará'],
+        'PB': ['Paraíba'],
+        'PE': ['Pernambuco'],
+        'PI': ['Piauí'],
+        'PR': ['Paraná'],
+        'RJ': ['Rio de Janeiro'],
+        'RN': ['Rio Grande do Norte', 'Rio grande do Norte'],
+        'RO': ['Rondônia'],
+        'RR': ['Roraima'],
+        'RS': ['Rio Grande do Sul'],
+        'SC': ['Santa Catarina'],
+        'SE': ['Sergipe'],
+        'SP': ['São Paulo'],
+        'TO': ['Tocantins']
+    }
+    
+    # Mapeamento padrão Region → FUs
+    DEFAULT_FU_REGION_MAPPING = {
+        'North': ['AC', 'AM', 'AP', 'PA', 'RO', 'RR', 'TO'],
+        'Northeast': ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
+        'Midwest': ['DF', 'GO', 'MS', 'MT'],
+        'Southeast': ['ES', 'MG', 'RJ', 'SP'],
+        'South': ['PR', 'RS', 'SC']
+    }
+    
+    # Inverso do mapeamento padrão (FU → Region), calculado uma única vez
+    DEFAULT_REGION_BY_FU = {
+        fu: region for region, fus in DEFAULT_FU_REGION_MAPPING.items() for fu in fus
+    }
+    
+    # Limites de amostras incluídas nos relatórios
+    MAX_ROWS_REPORTED = 50
+    MAX_MISMATCH_TYPES = 10
+    
     @property
     def name(self) -> str:
         return "coherence"
@@ -26,17 +88,15 @@ class CoherenceCheck(BaseCheck):
         warnings = []
         info = []
         
-        # Validar FU ↔ Federal_Un
-        if 'FU' in df.columns and 'Federal_Un' in df.columns:
-            fu_state_result = self._validate_fu_state(df, config)
-            errors.extend(fu_state_result['errors'])
-            warnings.extend(fu_state_result['warnings'])
-        
-        # Validar Region ↔ FU
-        if 'Region' in df.columns and 'FU' in df.columns:
-            region_fu_result = self._validate_region_fu(df, config)
-            errors.extend(region_fu_result['errors'])
-            warnings.extend(region_fu_result['warnings'])
+        # Validar FU ↔ Federal_Un e Region ↔ FU
+        for message, (invalid_index, mismatch_types) in self._mapping_mismatches(df, config).items():
+            if len(invalid_index):
+                errors.append(self._mismatch_error(
+                    message,
+                    invalid_index[:self.MAX_ROWS_REPORTED].tolist(),
+                    len(invalid_index),
+                    mismatch_types
+                ))
         
         # Validar Atendiment ↔ Atendime_1 count
         if 'Atendiment' in df.columns and 'Atendime_1' in df.columns:
@@ -54,183 +114,206 @@ class CoherenceCheck(BaseCheck):
             info=info
         )
     
-    def _validate_fu_state(self, df: pd.DataFrame, config: ManifestConfig) -> dict:
-        """Valida mapeamento FU → Federal_Un."""
-        result = {'errors': [], 'warnings': []}
+    def reset_stream(self) -> None:
+        super().reset_stream()
+        # Inconsistências de mapeamento acumuladas por regra no modo streaming (ver `run_chunk`)
+        self._stream_mismatches = {}
+    
+    def run_chunk(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        """
+        Acumula as inconsistências de mapeamento do bloco (com a contagem de
+        todos os tipos); os achados são montados uma única vez, sobre todos os
+        blocos, em `merge_results`. A contagem de Atendiment é validada no bloco.
+        """
+        for message, (invalid_index, mismatch_types) in self._mapping_mismatches(df, config).items():
+            acc = self._stream_mismatches.setdefault(message, {'indices': [], 'total': 0, 'types': Counter()})
+            acc['indices'].extend(invalid_index[:self.MAX_ROWS_REPORTED - len(acc['indices'])].tolist())
+            acc['total'] += len(invalid_index)
+            acc['types'].update(mismatch_types)  # novos tipos entram na ordem de ocorrência
         
-        # Usar mapeamento do config ou padrão
-        fu_to_state = config.fu_to_state if config.fu_to_state else self._get_default_fu_state_mapping()
+        result = ValidationResult(category=self.name, passed=True)
+        if 'Atendiment' in df.columns and 'Atendime_1' in df.columns:
+            atend_result = self._validate_atendimento_count(df, config)
+            result.warnings.extend(atend_result['warnings'])
+            result.info.extend(atend_result['info'])
         
-        invalid_indices = []
-        mismatches = {}
+        return result
+    
+    def merge_results(self, results: list[ValidationResult], config: ManifestConfig) -> ValidationResult:
+        """
+        Achados de mapeamento sobre todos os blocos, a partir das inconsistências
+        acumuladas por `run_chunk`; os de Atendiment combinados por tipo.
+        """
+        merged = self.merge_row_results(results)
         
-        for idx, row in df.iterrows():
-            fu = row.get('FU')
-            state = row.get('Federal_Un')
-            
-            if pd.isna(fu) or pd.isna(state):
-                continue
-            
-            expected_states = fu_to_state.get(fu, [])
-            if isinstance(expected_states, str):
-                expected_states = [expected_states]
-            
-            if state not in expected_states:
-                invalid_indices.append(idx)
-                key = f"{fu} → {state}"
-                mismatches[key] = mismatches.get(key, 0) + 1
-        
-        if invalid_indices:
-            result['errors'].append(
-                self.create_error(
-                    severity=Severity.MAJOR,
-                    message=f"FU não corresponde a Federal_Un ({len(invalid_indices)} registros)",
-                    row_indices=invalid_indices[:50],
-                    details={
-                        "total_mismatches": len(invalid_indices),
-                        "mismatch_types": dict(sorted(mismatches.items(), key=lambda x: -x[1])[:10])
-                    }
+        for message, acc in self._stream_mismatches.items():
+            if acc['total']:
+                merged.errors.append(
+                    self._mismatch_error(message, acc['indices'], acc['total'], acc['types'])
                 )
-            )
         
-        return result
+        merged.passed = len(merged.errors) == 0
+        return merged
     
-    def _validate_region_fu(self, df: pd.DataFrame, config: ManifestConfig) -> dict:
-        """Valida mapeamento Region → FU."""
-        result = {'errors': [], 'warnings': []}
+    def _mapping_mismatches(self, df: pd.DataFrame, config: ManifestConfig) -> dict[str, tuple[pd.Index, Counter]]:
+        """
+        Inconsistências de cada regra de mapeamento presente em `df`, pela
+        mensagem do achado: índice das linhas inconsistentes e contagem por tipo
+        de inconsistência (na ordem da primeira ocorrência).
+        """
+        cat_df = as_categorical(df, CATEGORICAL_COLUMNS)
+        mismatches = {}
+        
+        if 'FU' in df.columns and 'Federal_Un' in df.columns:
+            mismatches["FU não corresponde a Federal_Un"] = self._fu_state_mismatches(cat_df, config)
+        
+        if 'Region' in df.columns and 'FU' in df.columns:
+            mismatches["Region inconsistente com FU"] = self._region_fu_mismatches(cat_df, config)
         
+        return mismatches
+    
+    def _mismatch_error(
+        self,
+        message: str,
+        row_indices: list,
+        total: int,
+        mismatch_types: Counter
+    ) -> ValidationError:
+        """Achado de uma regra de mapeamento, com os `MAX_MISMATCH_TYPES` tipos mais frequentes."""
+        return self.create_error(
+            severity=Severity.MAJOR,
+            message=message,
+            row_count=total,
+            row_indices=row_indices,
+            row_limit=self.MAX_ROWS_REPORTED,
+            details={
+                "total_mismatches": total,
+                # Empates mantêm a ordem da primeira ocorrência
+                "mismatch_types": dict(mismatch_types.most_common(self.MAX_MISMATCH_TYPES))
+            }
+        )
+    
+    def _fu_state_mismatches(self, df: pd.DataFrame, config: ManifestConfig) -> tuple[pd.Index, Counter]:
+        """Inconsistências do mapeamento FU → Federal_Un."""
         # Usar mapeamento do config ou padrão
-        fu_to_region = config.fu_to_region if config.fu_to_region else self._get_default_fu_region_mapping()
+        fu_to_state = config.fu_to_state or self.DEFAULT_FU_STATE_MAPPING
         
-        # Inverter para FU → Region
-        fu_region_map = {}
-        for region, fus in fu_to_region.items():
-            for fu in fus:
-                fu_region_map[fu] = region
+        # Pares (FU, Federal_Un) válidos
+        valid = pd.MultiIndex.from_tuples(
+            [
+                (fu, state)
+                for fu, states in fu_to_state.items()
+                for state in ([states] if isinstance(states, str) else states)
+            ],
+            names=['FU', 'Federal_Un']
+        )
         
-        invalid_indices = []
-        mismatches = {}
+        pairs = df[['FU', 'Federal_Un']].dropna()
+        fu_cats = pairs['FU'].cat.categories
+        state_cats = pairs['Federal_Un'].cat.categories
         
-        for idx, row in df.iterrows():
-            fu = row.get('FU')
-            region = row.get('Region')
-            
-            if pd.isna(fu) or pd.isna(region):
-                continue
-            
-            expected_region = fu_region_map.get(fu)
-            
-            if expected_region and region != expected_region:
-                invalid_indices.append(idx)
-                key = f"{fu}:{region} (esperado: {expected_region})"
-                mismatches[key] = mismatches.get(key, 0) + 1
-        
-        if invalid_indices:
-            result['errors'].append(
-                self.create_error(
-                    severity=Severity.MAJOR,
-                    message=f"Region inconsistente com FU ({len(invalid_indices)} registros)",
-                    row_indices=invalid_indices[:50],
-                    details={
-                        "total_mismatches": len(invalid_indices),
-                        "mismatch_types": dict(sorted(mismatches.items(), key=lambda x: -x[1])[:10])
-                    }
-                )
-            )
+        # Comparar pares pelos códigos das categorias: código = fu * n_estados + estado
+        valid_fu = fu_cats.get_indexer(valid.get_level_values('FU'))
+        valid_state = state_cats.get_indexer(valid.get_level_values('Federal_Un'))
+        known = (valid_fu >= 0) & (valid_state >= 0)
+        valid_keys = valid_fu[known].astype(np.int64) * len(state_cats) + valid_state[known]
         
-        return result
+        keys = (
+            pairs['FU'].cat.codes.to_numpy(np.int64) * len(state_cats)
+            + pairs['Federal_Un'].cat.codes.to_numpy(np.int64)
+        )
+        invalid = pairs[~np.isin(keys, valid_keys)]
+        
+        counts = invalid.groupby(['FU', 'Federal_Un'], sort=False, observed=True).size()
+        return invalid.index, Counter({
+            f"{fu} → {state}": int(n) for (fu, state), n in counts.items()
+        })
+    
+    def _region_fu_mismatches(self, df: pd.DataFrame, config: ManifestConfig) -> tuple[pd.Index, Counter]:
+        """Inconsistências do mapeamento Region → FU."""
+        # Usar mapeamento do config (invertido para FU → Region) ou padrão
+        if config.fu_to_region:
+            fu_region_map = invert_region_mapping(config.fu_to_region)
+        else:
+            fu_region_map = self.DEFAULT_REGION_BY_FU
+        
+        sub = df[['FU', 'Region']].dropna()
+        fu_codes = sub['FU'].cat.codes.to_numpy()
+        
+        # Region esperada por categoria de FU, convertida em código de Region
+        expected = sub['FU'].cat.categories.map(fu_region_map)
+        has_expected = expected.notna()
+        expected_codes = sub['Region'].cat.categories.get_indexer(expected)
+        
+        mask = has_expected[fu_codes] & (sub['Region'].cat.codes.to_numpy() != expected_codes[fu_codes])
+        
+        counts = (
+            sub.loc[mask].assign(expected=expected[fu_codes[mask]])
+            .groupby(['FU', 'Region', 'expected'], sort=False, observed=True).size()
+        )
+        return sub.index[mask], Counter({
+            f"{fu}:{region} (esperado: {expected_region})": int(n)
+            for (fu, region, expected_region), n in counts.items()
+        })
     
     def _validate_atendimento_count(self, df: pd.DataFrame, config: ManifestConfig) -> dict:
         """Valida se contagem de itens em Atendiment == Atendime_1."""
         result = {'warnings': [], 'info': []}
         
-        mismatch_indices = []
-        
-        for idx, row in df.iterrows():
-            atend = row.get('Atendiment')
-            atend_1 = row.get('Atendime_1')
-            
-            if pd.isna(atend) or pd.isna(atend_1):
-                continue
-            
-            count_atend = count_comma_separated(str(atend))
-            count_atend_1 = count_comma_separated(str(atend_1))
-            
-            if count_atend != count_atend_1:
-                mismatch_indices.append(idx)
-        
-        if mismatch_indices:
+        sub = df[['Atendiment', 'Atendime_1']].dropna()
+        count_atend = sub['Atendiment'].astype(str).str.count(NONEMPTY_ITEM_PATTERN)
+        count_atend_1 = sub['Atendime_1'].astype(str).str.count(NONEMPTY_ITEM_PATTERN)
+        
+        mask = count_atend != count_atend_1
+        total = int(mask.sum())
+        
+        if total:
             result['warnings'].append(
                 self.create_error(
                     severity=Severity.MINOR,
-                    message=f"Contagem de itens diferente entre Atendiment e Atendime_1 ({len(mismatch_indices)} registros)",
-                    row_indices=mismatch_indices[:30],
-                    details={"total_mismatches": len(mismatch_indices)}
+                    message="Contagem de itens diferente entre Atendiment e Atendime_1",
+                    row_count=total,
+                    row_indices=sub.index[mask][:30].tolist(),
+                    row_limit=30,
+                    details={"total_mismatches": total}
                 )
             )
         
         return result
-    
-    def _get_default_fu_state_mapping(self) -> dict:
-        """Retorna mapeamento padrão FU → Estado."""
-        return {
-            'AC': ['Acre'],
-            'AL': ['Alagoas'],
-            'AM': ['Amazonas'],
-            'AP': ['Amapá'],
-            'BA': ['Bahia'],
-            'CE': ['Ceará'],
-            'DF': ['Distrito Federal'],
-            'ES': ['Espírito Santo', 'Espiríto Santo'],
-            'GO': ['Goiás'],
-            'MA': ['Maranhão'],
-            'MG': ['Minas Gerais'],
-            'MS': ['Mato Grosso do Sul'],
-            'MT': ['Mato Grosso'],
-            'PA': ['Pará'],
-            'PB': ['Paraíba'],
-            'PE': ['Pernambuco'],
-            'PI': ['Piauí'],
-            'PR': ['Paraná'],
-            'RJ': ['Rio de Janeiro'],
-            'RN': ['Rio Grande do Norte', 'Rio grande do Norte'],
-            'RO': ['Rondônia'],
-            'RR': ['Roraima'],
-            'RS': ['Rio Grande do Sul'],
-            'SC': ['Santa Catarina'],
-            'SE': ['Sergipe'],
-            'SP': ['São Paulo'],
-            'TO': ['Tocantins']
-        }
-    
-    def _get_default_fu_region_mapping(self) -> dict:
-        """Retorna mapeamento padrão Region → FUs."""
-        return {
-            'North': ['AC', 'AM', 'AP', 'PA', 'RO', 'RR', 'TO'],
-            'Northeast': ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
-            'Midwest': ['DF', 'GO', 'MS', 'MT'],
-            'Southeast': ['ES', 'MG', 'RJ', 'SP'],
-            'South': ['PR', 'RS', 'SC']
-        }
+
+
+def as_categorical(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Retorna as colunas presentes em `columns` convertidas para Categorical (sem alterar `df`)."""
+    present = [col for col in columns if col in df.columns]
+    return df[present].astype({
+        col: 'category' for col in present if not isinstance(df[col].dtype, pd.CategoricalDtype)
+    })
+
+
+def invert_region_mapping(fu_to_region: dict) -> dict:
+    """Inverte mapeamento Region → FUs para FU → Region."""
+    return {fu: region for region, fus in fu_to_region.items() for fu in fus}
 
 
 def count_comma_separated(value: str) -> int:
     """Conta itens separados por vírgula."""
-    if not value or pd.isna(value):
+    if _missing(value):
         return 0
     
-    items = [item.strip() for item in str(value).split(',') if item.strip()]
-    return len(items)
+    return len(_NONEMPTY_ITEM.findall(str(value)))
+
+
+def _missing(value) -> bool:
+    """Teste escalar de valor ausente (None, NA, NaN ou string vazia) sem passar por `pd.isna`."""
+    return value is None or value is pd.NA or (isinstance(value, float) and value != value) or value == ''
 
 
-def load_mapping(mapping_file: str) -> dict:
-    """Carrega arquivo de mapeamento YAML."""
-    import yaml
+def load_mapping(mapping_file: str) -> Mapping[str, Sequence[str]]:
+    """Carrega arquivo de mapeamento YAML (somente leitura, em cache)."""
     from pathlib import Path
     
     path = Path(mapping_file)
     if not path.exists():
         return {}
     
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f) or {}
+    return load_mapping_yaml(path)
@@ -4,6 +4,7 @@ Validação de restrições de campo (CNES, Telefone, etc).
 
 import re
 import pandas as pd
+from functools import lru_cache, partial
 from typing import Optional
 
 from .base import BaseCheck
@@ -11,9 +12,15 @@ from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
 
+# Caracteres não numéricos (normalização de telefone)
+_NON_DIGIT = re.compile(r'\D')
+
+
 class ConstraintsCheck(BaseCheck):
     """Valida restrições de formato em campos específicos."""
     
+    STREAMABLE = True
+    
     @property
     def name(self) -> str:
         return "constraints"
@@ -23,45 +30,95 @@ class ConstraintsCheck(BaseCheck):
         return "Valida formato de CNES, Telefone e outros campos com padrões"
     
     def run(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        return self._run(df, config, check_missingness=True)
+    
+    def reset_stream(self) -> None:
+        super().reset_stream()
+        # Nulos por coluna e linhas acumulados no modo streaming (ver `run_chunk`)
+        self._stream_nulls: Optional[pd.Series] = None
+        self._stream_rows = 0
+    
+    def run_chunk(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        """
+        Valida um bloco sem o check de missingness, que depende da taxa de
+        nulos do arquivo inteiro: as contagens são acumuladas e avaliadas em
+        `merge_results`.
+        """
+        null_counts = df.isna().sum()
+        if self._stream_nulls is None:
+            self._stream_nulls = null_counts
+        else:
+            self._stream_nulls = self._stream_nulls.add(null_counts, fill_value=0)
+        self._stream_rows += len(df)
+        
+        return self._run(df, config, check_missingness=False)
+    
+    def merge_results(self, results: list[ValidationResult], config: ManifestConfig) -> ValidationResult:
+        """Achados por bloco combinados, mais o missingness calculado sobre todas as linhas."""
+        merged = self.merge_row_results(results)
+        
+        if self._stream_nulls is not None:
+            missingness_result = self._missingness_result(
+                self._stream_nulls.astype('int64'), self._stream_rows, config
+            )
+            merged.errors.extend(missingness_result['errors'])
+            merged.warnings.extend(missingness_result['warnings'])
+            merged.info.extend(missingness_result['info'])
+            merged.passed = len(merged.errors) == 0
+        
+        return merged
+    
+    def _run(self, df: pd.DataFrame, config: ManifestConfig, check_missingness: bool) -> ValidationResult:
         errors = []
         warnings = []
         info = []
         
+        # Outros campos com pattern no config (CNES e Telefone têm validação própria)
+        pattern_constraints = []
+        if hasattr(config, 'constraints') and config.constraints:
+            pattern_constraints = [
+                (col_name, constraint)
+                for col_name, constraint in config.constraints.items()
+                if col_name not in ['CNES', 'Telefone']
+                and col_name in df.columns and hasattr(constraint, 'pattern') and constraint.pattern
+            ]
+        
+        # Sub-checks independentes (somente leitura sobre df); `dict` gera
+        # um resultado vazio quando a coluna não existe
+        cnes_result, tel_result, missingness_result, *pattern_results = self.run_subchecks(df, [
+            partial(self._validate_cnes, df, config) if 'CNES' in df.columns else dict,
+            partial(self._validate_telefone, df, config) if 'Telefone' in df.columns else dict,
+            partial(self._check_missingness, df, config) if check_missingness else dict,
+            *(
+                partial(self._validate_pattern, df, col_name, constraint)
+                for col_name, constraint in pattern_constraints
+            )
+        ])
+        
         # Validar CNES
-        if 'CNES' in df.columns:
-            cnes_result = self._validate_cnes(df, config)
-            if cnes_result:
-                errors.extend(cnes_result.get('errors', []))
-                warnings.extend(cnes_result.get('warnings', []))
-                info.extend(cnes_result.get('info', []))
+        if cnes_result:
+            errors.extend(cnes_result.get('errors', []))
+            warnings.extend(cnes_result.get('warnings', []))
+            info.extend(cnes_result.get('info', []))
         
         # Validar Telefone
-        if 'Telefone' in df.columns:
-            tel_result = self._validate_telefone(df, config)
-            if tel_result:
-                warnings.extend(tel_result.get('warnings', []))
-                info.extend(tel_result.get('info', []))
+        if tel_result:
+            warnings.extend(tel_result.get('warnings', []))
+            info.extend(tel_result.get('info', []))
         
         # Validar outros campos com pattern no config
-        if hasattr(config, 'constraints') and config.constraints:
-            for col_name, constraint in config.constraints.items():
-                if col_name in ['CNES', 'Telefone']:
-                    continue  # Já validados acima
-                
-                if col_name in df.columns and hasattr(constraint, 'pattern') and constraint.pattern:
-                    pattern_result = self._validate_pattern(df, col_name, constraint)
-                    severity = getattr(constraint, 'severity', 'MINOR')
-                    if severity == 'BLOCKER':
-                        errors.extend(pattern_result)
-                    elif severity == 'MAJOR':
-                        errors.extend(pattern_result)
-                    elif severity == 'MINOR':
-                        warnings.extend(pattern_result)
-                    else:
-                        info.extend(pattern_result)
+        for (col_name, constraint), pattern_result in zip(pattern_constraints, pattern_results):
+            severity = getattr(constraint, 'severity', 'MINOR')
+            if severity == 'BLOCKER':
+                errors.extend(pattern_result)
+            elif severity == 'MAJOR':
+                errors.extend(pattern_result)
+            elif severity == 'MINOR':
+                warnings.extend(pattern_result)
+            else:
+                info.extend(pattern_result)
         
         # Validar missingness
-        missingness_result = self._check_missingness(df, config)
         if missingness_result:
             errors.extend(missingness_result.get('errors', []))
             warnings.extend(missingness_result.get('warnings', []))
@@ -101,24 +158,20 @@ class ConstraintsCheck(BaseCheck):
         if cnes_config and hasattr(cnes_config, 'pattern') and cnes_config.pattern:
             pattern = cnes_config.pattern
         
-        invalid_indices = []
-        special_value_indices = []
+        # Valores não nulos como texto, limpos de uma só vez
+        raw = df['CNES'].dropna().astype(str)
+        cleaned = raw
+        if strip_chars:
+            cleaned = cleaned.str.translate(_strip_table(strip_chars))
+        cleaned = cleaned.str.strip()
         
-        for idx, val in df['CNES'].items():
-            if pd.isna(val):
-                continue
-            
-            # Limpar valor
-            cleaned = clean_cnes(str(val), strip_chars)
-            
-            # Verificar se é valor especial permitido
-            if str(val) in special_values or cleaned in special_values:
-                special_value_indices.append(idx)
-                continue
-            
-            # Validar pattern
-            if not re.match(pattern, cleaned):
-                invalid_indices.append(idx)
+        # Valores especiais permitidos não são validados contra o pattern
+        special_set = frozenset(special_values)
+        special_mask = raw.isin(special_set) | cleaned.isin(special_set)
+        invalid_mask = ~special_mask & ~cleaned.str.fullmatch(_compile_pattern(pattern), na=False)
+        
+        invalid_indices = raw.index[invalid_mask].tolist()
+        special_value_indices = raw.index[special_mask].tolist()
         
         if invalid_indices:
             sev_str = cnes_config.severity if cnes_config and hasattr(cnes_config, 'severity') else 'MAJOR'
@@ -129,12 +182,15 @@ class ConstraintsCheck(BaseCheck):
             result['errors' if severity in [Severity.BLOCKER, Severity.MAJOR] else 'warnings'].append(
                 self.create_error(
                     severity=severity,
-                    message=f"CNES com formato inválido ({len(invalid_indices)} registros)",
+                    message="CNES com formato inválido",
+                    row_count=len(invalid_indices),
                     column="CNES",
-                    row_indices=invalid_indices[:50],
+                    row_indices=invalid_indices,
+                    row_limit=50,
+                    detail_limits={"sample_invalid": 5},
                     details={
                         "pattern": pattern,
-                        "sample_invalid": [str(df.loc[i, 'CNES']) for i in invalid_indices[:5]]
+                        "sample_invalid": raw[invalid_mask].head(5).tolist()
                     }
                 )
             )
@@ -143,9 +199,11 @@ class ConstraintsCheck(BaseCheck):
             result['info'].append(
                 self.create_error(
                     severity=Severity.INFO,
-                    message=f"CNES com valores especiais permitidos ({len(special_value_indices)} registros)",
+                    message="CNES com valores especiais permitidos",
+                    row_count=len(special_value_indices),
                     column="CNES",
-                    row_indices=special_value_indices[:20]
+                    row_indices=special_value_indices,
+                    row_limit=20
                 )
             )
         
@@ -162,33 +220,31 @@ class ConstraintsCheck(BaseCheck):
         special_values = tel_config.allow_special_values if tel_config and hasattr(tel_config, 'allow_special_values') else ['Sem contato']
         pattern = tel_config.pattern if tel_config and hasattr(tel_config, 'pattern') else r'^[\d\s\-\(\)\/\+]+$'
         
-        invalid_indices = []
-        empty_indices = []
+        stripped = df['Telefone'].astype(str).str.strip()
+        empty_mask = (df['Telefone'].isna() | (stripped == '')).to_numpy()
         
-        for idx, val in df['Telefone'].items():
-            if pd.isna(val) or str(val).strip() == '':
-                empty_indices.append(idx)
-                continue
-            
-            val_str = str(val).strip()
-            
-            # Verificar valores especiais
-            if val_str in special_values:
-                continue
-            
-            # Validar pattern
-            if not re.match(pattern, val_str):
-                invalid_indices.append(idx)
+        # Valores especiais permitidos não são validados contra o pattern
+        invalid_mask = (
+            ~empty_mask
+            & ~stripped.isin(frozenset(special_values)).to_numpy()
+            & ~stripped.str.fullmatch(_compile_pattern(pattern), na=False).to_numpy()
+        )
+        
+        invalid_indices = df.index[invalid_mask].tolist()
+        empty_indices = df.index[empty_mask].tolist()
         
         if invalid_indices:
             result['warnings'].append(
                 self.create_error(
                     severity=Severity.MINOR,
-                    message=f"Telefones com formato inválido ({len(invalid_indices)} registros)",
+                    message="Telefones com formato inválido",
+                    row_count=len(invalid_indices),
                     column="Telefone",
-                    row_indices=invalid_indices[:30],
+                    row_indices=invalid_indices,
+                    row_limit=30,
+                    detail_limits={"sample_invalid": 5},
                     details={
-                        "sample_invalid": [str(df.loc[i, 'Telefone']) for i in invalid_indices[:5]]
+                        "sample_invalid": df['Telefone'][invalid_mask].head(5).astype(str).tolist()
                     }
                 )
             )
@@ -197,9 +253,11 @@ class ConstraintsCheck(BaseCheck):
             result['info'].append(
                 self.create_error(
                     severity=Severity.INFO,
-                    message=f"Telefones vazios/nulos ({len(empty_indices)} registros)",
+                    message="Telefones vazios/nulos",
+                    row_count=len(empty_indices),
                     column="Telefone",
-                    row_indices=empty_indices[:20]
+                    row_indices=empty_indices,
+                    row_limit=20
                 )
             )
         
@@ -208,28 +266,26 @@ class ConstraintsCheck(BaseCheck):
     def _validate_pattern(self, df: pd.DataFrame, col_name: str, constraint) -> list[ValidationError]:
         """Valida coluna genérica contra pattern."""
         errors = []
-        invalid_indices = []
         
-        for idx, val in df[col_name].items():
-            if pd.isna(val):
-                if not constraint.allow_empty:
-                    invalid_indices.append(idx)
-                continue
-            
-            val_str = str(val)
-            if constraint.strip_chars:
-                val_str = val_str.strip(constraint.strip_chars)
-            
-            if not re.match(constraint.pattern, val_str):
-                invalid_indices.append(idx)
+        null_mask = df[col_name].isna().to_numpy()
+        values = df[col_name].astype(str)
+        if constraint.strip_chars:
+            values = values.str.strip(constraint.strip_chars)
+        
+        invalid_mask = ~null_mask & ~values.str.match(_compile_pattern(constraint.pattern), na=False).to_numpy()
+        if not constraint.allow_empty:
+            invalid_mask |= null_mask
+        invalid_indices = df.index[invalid_mask].tolist()
         
         if invalid_indices:
             errors.append(
                 self.create_error(
-                    severity=Severity[constraint.severity],
-                    message=f"'{col_name}' com formato inválido ({len(invalid_indices)} registros)",
+                    severity=constraint.severity_level,
+                    message=f"'{col_name}' com formato inválido",
+                    row_count=len(invalid_indices),
                     column=col_name,
-                    row_indices=invalid_indices[:50],
+                    row_indices=invalid_indices,
+                    row_limit=50,
                     details={"pattern": constraint.pattern}
                 )
             )
@@ -238,6 +294,11 @@ class ConstraintsCheck(BaseCheck):
     
     def _check_missingness(self, df: pd.DataFrame, config: ManifestConfig) -> dict:
         """Verifica taxa de valores nulos."""
+        # Contagem de nulos de todas as colunas em uma única passada
+        return self._missingness_result(df.isna().sum(), len(df), config)
+    
+    def _missingness_result(self, null_counts: pd.Series, n_rows: int, config: ManifestConfig) -> dict:
+        """Compara a taxa de nulos de cada coluna (`null_counts` sobre `n_rows` linhas) com o config."""
         result = {'errors': [], 'warnings': [], 'info': []}
         
         # Usar configuração de missingness se disponível
@@ -245,9 +306,8 @@ class ConstraintsCheck(BaseCheck):
         if hasattr(config, 'missingness') and config.missingness:
             missingness_config = config.missingness
         
-        for col in df.columns:
-            null_count = df[col].isna().sum()
-            null_rate = null_count / len(df) if len(df) > 0 else 0
+        for col, null_count in null_counts.items():
+            null_rate = null_count / n_rows if n_rows > 0 else 0
             
             miss_config = missingness_config.get(col, {})
             max_rate = miss_config.get('max_null_rate', 1.0)
@@ -280,14 +340,23 @@ class ConstraintsCheck(BaseCheck):
 
 def clean_cnes(value: str, strip_chars: str = "\t \n") -> str:
     """Remove caracteres especiais do CNES."""
-    result = value
-    for char in strip_chars:
-        result = result.replace(char, '')
-    return result.strip()
+    return value.translate(_strip_table(strip_chars)).strip()
 
 
 def normalize_telefone(value: str) -> str:
     """Extrai apenas dígitos do telefone."""
     if pd.isna(value):
         return ''
-    return re.sub(r'\D', '', str(value))
+    return _NON_DIGIT.sub('', str(value))
+
+
+@lru_cache(maxsize=None)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compila um pattern uma única vez (reutilizado entre chamadas e execuções)."""
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=8)
+def _strip_table(strip_chars: str) -> dict:
+    """Tabela de `str.translate` que remove todos os caracteres de `strip_chars`."""
+    return str.maketrans('', '', strip_chars)
@@ -2,13 +2,26 @@
 Validação geoespacial (coordenadas).
 """
 
+import numpy as np
 import pandas as pd
+from dataclasses import dataclass
+from functools import partial
+from math import radians, cos, sin, sqrt, atan2
 from typing import Optional, Tuple, List
 
 from .base import BaseCheck
 from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
+try:
+    import numba
+except ImportError:  # dependência opcional
+    numba = None
+
+
+# Raio médio da Terra em km
+EARTH_RADIUS_KM = 6371
+
 
 class GeospatialCheck(BaseCheck):
     """Valida coordenadas geoespaciais."""
@@ -53,27 +66,40 @@ class GeospatialCheck(BaseCheck):
         # Extrair bounds do config se disponível
         bounds = self._get_bounds(config)
         
+        # Conversão e máscaras de nulos calculadas uma única vez
+        coords = CoordinateArrays.from_frame(df, lat_col, lon_col)
+        
+        # Sub-checks independentes (somente leitura sobre df)
+        (
+            out_of_bounds_result,
+            null_result,
+            duplicate_result,
+            outlier_result,
+            suspicious_result
+        ) = self.run_subchecks(df, [
+            partial(self._validate_bounds, coords, bounds),
+            partial(self._validate_nulls, coords),
+            partial(self._detect_duplicate_coordinates, df, lat_col, lon_col),
+            partial(self._detect_outliers, df, lat_col, lon_col),
+            partial(self._detect_suspicious, coords)
+        ])
+        
         # Validar bounds gerais
-        out_of_bounds_result = self._validate_bounds(df, lat_col, lon_col, bounds)
         errors.extend(out_of_bounds_result['errors'])
         warnings.extend(out_of_bounds_result['warnings'])
         
         # Validar valores nulos
-        null_result = self._validate_nulls(df, lat_col, lon_col)
         warnings.extend(null_result['warnings'])
         info.extend(null_result['info'])
         
         # Detectar coordenadas duplicadas
-        duplicate_result = self._detect_duplicate_coordinates(df, lat_col, lon_col)
         warnings.extend(duplicate_result['warnings'])
         info.extend(duplicate_result['info'])
         
         # Detectar possíveis outliers
-        outlier_result = self._detect_outliers(df, lat_col, lon_col)
         warnings.extend(outlier_result['warnings'])
         
         # Detectar coordenadas suspeitas (ex: (0, 0))
-        suspicious_result = self._detect_suspicious(df, lat_col, lon_col)
         errors.extend(suspicious_result['errors'])
         
         passed = len(errors) == 0
@@ -99,52 +125,25 @@ class GeospatialCheck(BaseCheck):
             return config.geo_config.bounds
         return self.BRAZIL_BOUNDS
     
-    def _validate_bounds(self, df: pd.DataFrame, lat_col: str, lon_col: str, bounds: dict) -> dict:
+    def _validate_bounds(self, coords: 'CoordinateArrays', bounds: dict) -> dict:
         """Valida coordenadas dentro dos limites."""
         result = {'errors': [], 'warnings': []}
         
-        out_of_bounds_indices = []
-        details = {'lat_violations': [], 'lon_violations': []}
-        
         lat_min = bounds.get('lat_min', -90)
         lat_max = bounds.get('lat_max', 90)
         lon_min = bounds.get('lon_min', -180)
         lon_max = bounds.get('lon_max', 180)
         
-        for idx, row in df.iterrows():
-            lat = row.get(lat_col)
-            lon = row.get(lon_col)
-            
-            if pd.isna(lat) or pd.isna(lon):
-                continue
-            
-            try:
-                lat = float(lat)
-                lon = float(lon)
-            except (ValueError, TypeError):
-                out_of_bounds_indices.append(idx)
-                continue
-            
-            is_out = False
-            
-            if lat < lat_min or lat > lat_max:
-                is_out = True
-                details['lat_violations'].append({
-                    'idx': idx,
-                    'value': lat,
-                    'expected': f"[{lat_min}, {lat_max}]"
-                })
-            
-            if lon < lon_min or lon > lon_max:
-                is_out = True
-                details['lon_violations'].append({
-                    'idx': idx,
-                    'value': lon,
-                    'expected': f"[{lon_min}, {lon_max}]"
-                })
-            
-            if is_out:
-                out_of_bounds_indices.append(idx)
+        lat, lon = coords.lat, coords.lon
+        present = ~coords.lat_null & ~coords.lon_null
+        
+        # Valores não convertíveis contam como fora dos limites
+        parse_failed = present & (coords.lat_failed | coords.lon_failed)
+        checked = present & ~parse_failed
+        lat_out = checked & ((lat < lat_min) | (lat > lat_max))
+        lon_out = checked & ((lon < lon_min) | (lon > lon_max))
+        
+        out_of_bounds_indices = coords.index[parse_failed | lat_out | lon_out].tolist()
         
         if out_of_bounds_indices:
             severity = Severity.MAJOR if len(out_of_bounds_indices) > 10 else Severity.MINOR
@@ -156,26 +155,30 @@ class GeospatialCheck(BaseCheck):
                     details={
                         "total": len(out_of_bounds_indices),
                         "bounds": bounds,
-                        "lat_violations": len(details['lat_violations']),
-                        "lon_violations": len(details['lon_violations']),
-                        "sample_violations": details['lat_violations'][:5] + details['lon_violations'][:5]
+                        "lat_violations": int(lat_out.sum()),
+                        "lon_violations": int(lon_out.sum()),
+                        "sample_violations": (
+                            _violations(coords.index, lat, lat_out, lat_min, lat_max)
+                            + _violations(coords.index, lon, lon_out, lon_min, lon_max)
+                        )
                     }
                 )
             )
         
         return result
     
-    def _validate_nulls(self, df: pd.DataFrame, lat_col: str, lon_col: str) -> dict:
+    def _validate_nulls(self, coords: 'CoordinateArrays') -> dict:
         """Valida coordenadas nulas."""
         result = {'warnings': [], 'info': []}
         
-        null_lat = df[lat_col].isna().sum()
-        null_lon = df[lon_col].isna().sum()
+        null_lat = coords.lat_null.sum()
+        null_lon = coords.lon_null.sum()
+        n_rows = len(coords.index)
         
         if null_lat > 0 or null_lon > 0:
-            null_indices = df[df[lat_col].isna() | df[lon_col].isna()].index.tolist()
+            null_indices = coords.index[coords.lat_null | coords.lon_null].tolist()
             
-            severity = Severity.MAJOR if len(null_indices) > len(df) * 0.05 else Severity.MINOR
+            severity = Severity.MAJOR if len(null_indices) > n_rows * 0.05 else Severity.MINOR
             result['warnings'].append(
                 self.create_error(
                     severity=severity,
@@ -184,7 +187,7 @@ class GeospatialCheck(BaseCheck):
                     details={
                         "null_lat": null_lat,
                         "null_lon": null_lon,
-                        "percent": round((null_lat + null_lon) / (len(df) * 2) * 100, 2)
+                        "percent": round((null_lat + null_lon) / (n_rows * 2) * 100, 2)
                     }
                 )
             )
@@ -195,29 +198,26 @@ class GeospatialCheck(BaseCheck):
         """Detecta coordenadas duplicadas exatas."""
         result = {'warnings': [], 'info': []}
         
-        coord_df = df[[lat_col, lon_col]].dropna()
-        duplicates = coord_df[coord_df.duplicated(keep=False)]
+        # Uma única passada de hash: tamanho de cada grupo de coordenadas
+        sizes = df[[lat_col, lon_col]].dropna().groupby([lat_col, lon_col]).size()
+        dup_counts = sizes[sizes > 1]
+        total_duplicates = int(dup_counts.sum())
         
-        if len(duplicates) > 0:
-            # Agrupar duplicatas
-            dup_groups = duplicates.groupby([lat_col, lon_col]).size()
-            dup_counts = dup_groups[dup_groups > 1]
-            
-            if len(dup_counts) > 0:
-                result['info'].append(
-                    self.create_error(
-                        severity=Severity.INFO,
-                        message=f"Coordenadas duplicadas: {len(duplicates)} registros em {len(dup_counts)} localizações únicas",
-                        details={
-                            "total_duplicates": len(duplicates),
-                            "unique_locations": len(dup_counts),
-                            "top_duplicates": [
-                                {"coord": f"({lat}, {lon})", "count": count}
-                                for (lat, lon), count in dup_counts.head(10).items()
-                            ]
-                        }
-                    )
+        if total_duplicates > 0:
+            result['info'].append(
+                self.create_error(
+                    severity=Severity.INFO,
+                    message=f"Coordenadas duplicadas: {total_duplicates} registros em {len(dup_counts)} localizações únicas",
+                    details={
+                        "total_duplicates": total_duplicates,
+                        "unique_locations": len(dup_counts),
+                        "top_duplicates": [
+                            {"coord": f"({lat}, {lon})", "count": count}
+                            for (lat, lon), count in dup_counts.head(10).items()
+                        ]
+                    }
                 )
+            )
         
         return result
     
@@ -225,26 +225,24 @@ class GeospatialCheck(BaseCheck):
         """Detecta outliers usando IQR."""
         result = {'warnings': []}
         
-        outlier_indices = []
+        outlier_mask = np.zeros(len(df), dtype=bool)
         
         for col in [lat_col, lon_col]:
-            values = pd.to_numeric(df[col], errors='coerce').dropna()
+            # Uma única conversão por coluna, reutilizada nos quartis e na comparação
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
             
-            if len(values) < 10:
+            if np.count_nonzero(~np.isnan(values)) < 10:
                 continue
             
-            q1 = values.quantile(0.25)
-            q3 = values.quantile(0.75)
+            q1, q3 = np.nanquantile(values, [0.25, 0.75])
             iqr = q3 - q1
             
             lower_bound = q1 - 3 * iqr
             upper_bound = q3 + 3 * iqr
             
-            col_outliers = df[(pd.to_numeric(df[col], errors='coerce') < lower_bound) | 
-                             (pd.to_numeric(df[col], errors='coerce') > upper_bound)].index.tolist()
-            outlier_indices.extend(col_outliers)
+            outlier_mask |= (values < lower_bound) | (values > upper_bound)
         
-        outlier_indices = list(set(outlier_indices))
+        outlier_indices = df.index[outlier_mask].tolist()
         
         if outlier_indices:
             result['warnings'].append(
@@ -258,33 +256,16 @@ class GeospatialCheck(BaseCheck):
         
         return result
     
-    def _detect_suspicious(self, df: pd.DataFrame, lat_col: str, lon_col: str) -> dict:
+    def _detect_suspicious(self, coords: 'CoordinateArrays') -> dict:
         """Detecta coordenadas suspeitas (0,0), valores redondos excessivos."""
         result = {'errors': []}
         
-        suspicious_indices = []
+        lat, lon = coords.lat, coords.lon
+        checked = ~(coords.lat_null | coords.lon_null | coords.lat_failed | coords.lon_failed)
         
-        for idx, row in df.iterrows():
-            lat = row.get(lat_col)
-            lon = row.get(lon_col)
-            
-            if pd.isna(lat) or pd.isna(lon):
-                continue
-            
-            try:
-                lat = float(lat)
-                lon = float(lon)
-            except (ValueError, TypeError):
-                continue
-            
-            # Coordenada (0, 0) é suspeita
-            if lat == 0 and lon == 0:
-                suspicious_indices.append(idx)
-                continue
-            
-            # Coordenadas muito redondas (ex: -23.0, -46.0)
-            if lat == int(lat) and lon == int(lon):
-                suspicious_indices.append(idx)
+        # Coordenadas muito redondas (ex: -23.0, -46.0), incluindo (0, 0)
+        suspicious = checked & (np.floor(lat) == lat) & (np.floor(lon) == lon)
+        suspicious_indices = coords.index[suspicious].tolist()
         
         if suspicious_indices:
             result['errors'].append(
@@ -299,13 +280,68 @@ class GeospatialCheck(BaseCheck):
         return result
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calcula distância haversine em km."""
-    from math import radians, cos, sin, sqrt, atan2
+@dataclass
+class CoordinateArrays:
+    """Colunas de coordenadas convertidas para float64, com máscaras de nulos e falhas."""
+    index: pd.Index
+    lat: np.ndarray
+    lon: np.ndarray
+    lat_null: np.ndarray
+    lon_null: np.ndarray
+    lat_failed: np.ndarray
+    lon_failed: np.ndarray
     
-    R = 6371  # Raio da Terra em km
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lat_col: str, lon_col: str) -> 'CoordinateArrays':
+        """Converte as colunas de `df` uma única vez (ver `coerce_float`)."""
+        lat, lat_failed = coerce_float(df[lat_col])
+        lon, lon_failed = coerce_float(df[lon_col])
+        return cls(
+            index=df.index,
+            lat=lat,
+            lon=lon,
+            lat_null=df[lat_col].isna().to_numpy(),
+            lon_null=df[lon_col].isna().to_numpy(),
+            lat_failed=lat_failed,
+            lon_failed=lon_failed
+        )
+
+
+def coerce_float(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte uma coluna para float64 com a mesma semântica de `float(valor)`.
+    
+    Returns:
+        (valores, falhas): NaN onde a conversão falhou ou o valor é nulo, e
+        máscara das posições não nulas que `float()` não consegue converter.
+    """
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    failed = np.zeros(len(values), dtype=bool)
     
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    # `to_numeric` é mais restrito que `float()` (ex.: '1_000'); refazer só esses casos
+    for pos in np.flatnonzero(np.isnan(values) & series.notna().to_numpy()):
+        try:
+            value = float(series.iat[pos])
+        except (ValueError, TypeError):
+            failed[pos] = True
+        else:
+            values[pos] = value
+    
+    return values, failed
+
+
+def _violations(index: pd.Index, values: np.ndarray, mask: np.ndarray, low: float, high: float, limit: int = 5) -> list:
+    """Amostra de violações de limite no formato dos detalhes do relatório."""
+    positions = np.flatnonzero(mask)[:limit]
+    return [
+        {'idx': idx, 'value': float(value), 'expected': f"[{low}, {high}]"}
+        for idx, value in zip(index[positions].tolist(), values[positions])
+    ]
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calcula distância haversine em km."""
+    lat1, lon1, lat2, lon2 = radians(lat1), radians(lon1), radians(lat2), radians(lon2)
     
     dlat = lat2 - lat1
     dlon = lon2 - lon1
@@ -313,4 +349,41 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
     
-    return R * c
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_pairwise(lats, lons) -> np.ndarray:
+    """
+    Matriz N×N de distâncias haversine (km) entre todos os pares de pontos.
+    
+    Usa um kernel paralelo compilado com `numba` quando instalado e recorre a
+    broadcasting do NumPy caso contrário.
+    """
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    
+    if numba is not None:
+        return _haversine_pairwise_jit(lat, lon)
+    
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+if numba is not None:
+    haversine_distance = numba.njit(cache=True, fastmath=True)(haversine_distance)
+    
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _haversine_pairwise_jit(lat, lon):
+        """Kernel de `haversine_pairwise` (coordenadas já em radianos)."""
+        n = len(lat)
+        out = np.empty((n, n))
+        for i in numba.prange(n):
+            for j in range(n):
+                a = (
+                    np.sin((lat[j] - lat[i]) / 2) ** 2
+                    + np.cos(lat[i]) * np.cos(lat[j]) * np.sin((lon[j] - lon[i]) / 2) ** 2
+                )
+                out[i, j] = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        return out
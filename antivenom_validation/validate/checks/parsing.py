@@ -2,11 +2,13 @@
 Validação de parsing e normalização de dados.
 """
 
+import re
 import pandas as pd
-import unicodedata
+from functools import partial
 from typing import Optional
 
 from .base import BaseCheck
+from .geospatial import coerce_float
 from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
@@ -14,6 +16,22 @@ from ..manifest import ManifestConfig
 class ParsingCheck(BaseCheck):
     """Valida e normaliza parsing de dados."""
     
+    STREAMABLE = True
+    
+    # Caracteres Unicode especiais reportados pelo check
+    SPECIAL_CHARS = {
+        '\xa0': 'NBSP',
+        '\u200b': 'Zero-width space',
+        '\u2013': 'En-dash',
+        '\u2014': 'Em-dash'
+    }
+    
+    # Qualquer um dos caracteres especiais (uma única varredura por coluna)
+    SPECIAL_CHARS_RE = re.compile('[' + ''.join(SPECIAL_CHARS) + ']')
+    
+    # Máximo de linhas listadas por achado
+    MAX_ROWS_REPORTED = 50
+    
     @property
     def name(self) -> str:
         return "parsing"
@@ -23,12 +41,92 @@ class ParsingCheck(BaseCheck):
         return "Valida normalização de dados (whitespace, unicode, decimais)"
     
     def run(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        whitespace_issues, unicode_issues, numeric_issues = self._scan(df)
+        return self._build_result(
+            whitespace_issues,
+            unicode_issues,
+            {col: (len(issues), issues) for col, issues in numeric_issues.items()}
+        )
+    
+    def reset_stream(self) -> None:
+        super().reset_stream()
+        # Ocorrências acumuladas no modo streaming (ver `run_chunk`)
+        self._stream: Optional[dict] = None
+    
+    def run_chunk(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        """
+        Acumula as ocorrências do bloco; os achados são montados uma única vez,
+        sobre todos os blocos, em `merge_results`.
+        """
+        whitespace_issues, unicode_issues, numeric_issues = self._scan(df)
+        
+        if self._stream is None:
+            self._stream = {'columns': list(df.columns), 'whitespace': set(), 'unicode': {}, 'numeric': {}}
+        stream = self._stream
+        
+        stream['whitespace'].update(whitespace_issues)
+        for issue in unicode_issues:
+            stream['unicode'].setdefault(issue['column'], set()).update(issue['special_chars'])
+        for col, issues in numeric_issues.items():
+            count, head = stream['numeric'].get(col, (0, []))
+            stream['numeric'][col] = (count + len(issues), head + issues[:self.MAX_ROWS_REPORTED - len(head)])
+        
+        return ValidationResult(category=self.name, passed=True)
+    
+    def merge_results(self, results: list[ValidationResult], config: ManifestConfig) -> ValidationResult:
+        """Achados sobre todos os blocos acumulados por `run_chunk`, na ordem das colunas."""
+        merged = ValidationResult.merge(results)  # tempos e eventuais falhas de execução dos blocos
+        if self._stream is None:
+            return merged
+        
+        stream = self._stream
+        position = {col: i for i, col in enumerate(stream['columns'])}
+        unicode_cols = sorted(stream['unicode'], key=position.get)
+        
+        built = self._build_result(
+            sorted(stream['whitespace'], key=position.get),
+            [
+                {
+                    "column": col,
+                    "special_chars": [name for name in self.SPECIAL_CHARS.values() if name in stream['unicode'][col]]
+                }
+                for col in unicode_cols
+            ],
+            stream['numeric']
+        )
+        merged.errors.extend(built.errors)
+        merged.warnings.extend(built.warnings)
+        merged.info.extend(built.info)
+        merged.passed = len(merged.errors) == 0
+        return merged
+    
+    def _scan(self, df: pd.DataFrame) -> tuple[list[str], list[dict], dict[str, list[int]]]:
+        """Ocorrências de whitespace, Unicode especial e coordenadas não numéricas em `df`."""
+        # Colunas texto selecionadas uma única vez para os sub-checks
+        text_cols = df.select_dtypes(include=['object']).columns.tolist()
+        
+        # Sub-checks independentes (somente leitura sobre df)
+        coord_cols = [col for col in ('Lat', 'Lon') if col in df.columns]
+        whitespace_issues, unicode_issues, *numeric_issues = self.run_subchecks(df, [
+            partial(self._check_whitespace, df, text_cols),
+            partial(self._check_unicode, df, text_cols),
+            *(partial(self._check_numeric_column, df, col) for col in coord_cols)
+        ])
+        
+        return whitespace_issues, unicode_issues, dict(zip(coord_cols, numeric_issues))
+    
+    def _build_result(
+        self,
+        whitespace_issues: list[str],
+        unicode_issues: list[dict],
+        numeric_issues: dict[str, tuple[int, list[int]]]
+    ) -> ValidationResult:
+        """Monta o resultado; `numeric_issues` mapeia coluna -> (total, primeiros índices)."""
         errors = []
         warnings = []
         info = []
         
         # Verificar whitespace extra
-        whitespace_issues = self._check_whitespace(df)
         if whitespace_issues:
             warnings.append(self.create_error(
                 severity=Severity.MINOR,
@@ -37,7 +135,6 @@ class ParsingCheck(BaseCheck):
             ))
         
         # Verificar caracteres Unicode problemáticos
-        unicode_issues = self._check_unicode(df)
         if unicode_issues:
             info.append(self.create_error(
                 severity=Severity.INFO,
@@ -46,24 +143,13 @@ class ParsingCheck(BaseCheck):
             ))
         
         # Verificar valores numéricos em colunas de coordenadas
-        if 'Lat' in df.columns:
-            lat_issues = self._check_numeric_column(df, 'Lat')
-            if lat_issues:
-                errors.append(self.create_error(
-                    severity=Severity.MAJOR,
-                    message=f"Valores não numéricos em Lat ({len(lat_issues)} linhas)",
-                    column="Lat",
-                    row_indices=lat_issues[:50]
-                ))
-        
-        if 'Lon' in df.columns:
-            lon_issues = self._check_numeric_column(df, 'Lon')
-            if lon_issues:
+        for col, (count, issues) in numeric_issues.items():
+            if count:
                 errors.append(self.create_error(
                     severity=Severity.MAJOR,
-                    message=f"Valores não numéricos em Lon ({len(lon_issues)} linhas)",
-                    column="Lon",
-                    row_indices=lon_issues[:50]
+                    message=f"Valores não numéricos em {col} ({count} linhas)",
+                    column=col,
+                    row_indices=issues[:self.MAX_ROWS_REPORTED]
                 ))
         
         passed = len(errors) == 0
@@ -76,42 +162,50 @@ class ParsingCheck(BaseCheck):
             info=info
         )
     
-    def _check_whitespace(self, df: pd.DataFrame) -> list[str]:
-        """Verifica colunas com whitespace extra."""
+    def _check_whitespace(self, df: pd.DataFrame, columns: Optional[list[str]] = None) -> list[str]:
+        """Verifica colunas com whitespace extra (padrão: colunas object de `df`)."""
         issues = []
         
-        for col in df.select_dtypes(include=['object']).columns:
+        if columns is None:
+            columns = df.select_dtypes(include=['object']).columns
+        
+        for col in columns:
             series = df[col].dropna()
             if len(series) == 0:
                 continue
             
-            # Verifica se há diferença após strip
-            has_whitespace = (series.astype(str) != series.astype(str).str.strip()).any()
+            # Verifica se há diferença após strip (uma única conversão para texto)
+            text = series.astype(str)
+            has_whitespace = (text != text.str.strip()).any()
             if has_whitespace:
                 issues.append(col)
         
         return issues
     
-    def _check_unicode(self, df: pd.DataFrame) -> list[dict]:
-        """Verifica caracteres Unicode especiais (NBSP, etc)."""
+    def _check_unicode(self, df: pd.DataFrame, columns: Optional[list[str]] = None) -> list[dict]:
+        """Verifica caracteres Unicode especiais (NBSP, etc) (padrão: colunas object de `df`)."""
         issues = []
         
-        special_chars = {
-            '\xa0': 'NBSP',
-            '\u200b': 'Zero-width space',
-            '\u2013': 'En-dash',
-            '\u2014': 'Em-dash'
-        }
+        if columns is None:
+            columns = df.select_dtypes(include=['object']).columns
         
-        for col in df.select_dtypes(include=['object']).columns:
+        for col in columns:
             series = df[col].dropna()
             if len(series) == 0:
                 continue
             
-            col_issues = []
-            for char, name in special_chars.items():
-                if series.astype(str).str.contains(char, regex=False).any():
-                    col_issues.append(name)
+            text = series.astype(str)
+            hits = text[text.str.contains(self.SPECIAL_CHARS_RE)]
+            if hits.empty:
+                continue
+            
+            # Identificar quais caracteres aparecem, apenas nos valores com ocorrência;
+            # `any` com gerador para na primeira ocorrência de cada caractere
+            hit_values = hits.tolist()
+            col_issues = [
+                name for char, name in self.SPECIAL_CHARS.items()
+                if any(char in value for value in hit_values)
+            ]
             
             if col_issues:
                 issues.append({"column": col, "special_chars": col_issues})
@@ -124,15 +218,10 @@ class ParsingCheck(BaseCheck):
             # Já é numérico, verificar NaN inesperados
             return []
         
-        # Tentar converter e encontrar falhas
-        invalid_indices = []
-        for idx, val in df[col].items():
-            if pd.isna(val):
-                continue
-            try:
-                float(str(val).replace(',', '.'))
-            except (ValueError, TypeError):
-                invalid_indices.append(idx)
+        # Tentar converter (vírgula decimal aceita) e encontrar falhas
+        text = df[col].dropna().astype(str).str.replace(',', '.', regex=False)
+        _, failed = coerce_float(text)
+        invalid_indices = text.index[failed].tolist()
         
         return invalid_indices
 
@@ -141,26 +230,24 @@ def normalize_dataframe(df: pd.DataFrame, config: ManifestConfig) -> pd.DataFram
     """Aplica normalizações ao DataFrame."""
     df = df.copy()
     
-    # Trim whitespace em colunas string
+    # Trim whitespace e normalização Unicode (NFC) em colunas string
     for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-    
-    # Normalizar Unicode (NFC)
-    for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].apply(
-            lambda x: unicodedata.normalize('NFC', x) if isinstance(x, str) else x
-        )
+        try:
+            normalized = df[col].str.strip().str.normalize('NFC')
+        except AttributeError:
+            continue  # coluna sem nenhum valor string
+        # `.str` devolve NaN para valores que não são string: manter o original
+        df[col] = normalized.where(normalized.notna(), df[col])
     
     return df
 
 
 def convert_decimal_comma(series: pd.Series) -> pd.Series:
-    """Converte vírgula decimal para ponto."""
-    def convert(val):
-        if pd.isna(val):
-            return val
-        if isinstance(val, str):
-            return float(val.replace(',', '.'))
-        return val
-    
-    return series.apply(convert)
+    """
+    Converte vírgula decimal para ponto (vetorizado).
+    
+    Valores nulos são mantidos como estão; valores não numéricos viram NaN.
+    """
+    text = series.astype('string').str.replace(',', '.', regex=False)
+    converted = pd.to_numeric(text, errors='coerce').astype('float64')
+    return converted.where(series.notna(), series)
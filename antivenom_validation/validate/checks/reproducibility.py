@@ -2,6 +2,7 @@
 Validação de reprodutibilidade (hash, estabilidade).
 """
 
+import numpy as np
 import pandas as pd
 import hashlib
 import json
@@ -13,9 +14,16 @@ from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
 
+# Tipos NumPy hasheados pelo buffer binário (bool, int, uint, float, complex, datas)
+BINARY_KINDS = frozenset('biufcmM')
+
+
 class ReproducibilityCheck(BaseCheck):
     """Valida reprodutibilidade do dataset (hash, estabilidade)."""
     
+    # Linhas por bloco enviado ao SHA256
+    HASH_CHUNK_ROWS = 100_000
+    
     @property
     def name(self) -> str:
         return "reproducibility"
@@ -30,7 +38,7 @@ class ReproducibilityCheck(BaseCheck):
         info = []
         
         # Calcular hash do dataset
-        dataset_hash = self._compute_dataset_hash(df)
+        dataset_hash = self._compute_dataset_hash(df, config.primary_keys)
         
         info.append(
             self.create_error(
@@ -119,40 +127,104 @@ class ReproducibilityCheck(BaseCheck):
             info=info
         )
     
-    def _compute_dataset_hash(self, df: pd.DataFrame) -> str:
-        """Computa hash SHA256 do dataset."""
-        # Ordenar para garantir reprodutibilidade
-        df_sorted = df.sort_values(by=list(df.columns)).reset_index(drop=True)
+    def _compute_dataset_hash(self, df: pd.DataFrame, primary_keys: Optional[list] = None) -> str:
+        """
+        Computa hash SHA256 do dataset (independente da ordem das linhas).
+        
+        Hash incremental por coluna: colunas numéricas entram pelo buffer
+        binário; as demais, pela representação texto separada por NUL.
+        As linhas são ordenadas pelas `primary_keys` (se houver) e depois
+        pelas demais colunas; com chave única já ordenada, não há ordenação.
+        """
+        h = hashlib.sha256()
+        h.update(repr(list(df.columns)).encode('utf-8'))
+        h.update(repr({col: str(dtype) for col, dtype in df.dtypes.items()}).encode('utf-8'))
         
-        # Converter para string JSON-like (determinístico)
-        content = df_sorted.to_json(orient='records', date_format='iso')
+        # Ordenar as linhas pelo conteúdo para garantir reprodutibilidade
+        key_cols = [col for col in (primary_keys or []) if col in df.columns]
+        sort_cols = key_cols + [col for col in df.columns if col not in key_cols]
+        first_key = self._sort_key(df[sort_cols[0]]) if sort_cols else None
+        if not sort_cols or (len(key_cols) == 1 and self._is_strictly_increasing(first_key)):
+            # A ordenação abaixo resultaria na ordem atual (mesma chave, sem empates)
+            order = np.arange(len(df))
+        else:
+            arrays = [first_key] + [self._sort_key(df[col]) for col in sort_cols[1:]]
+            order = np.lexsort(arrays[::-1])
+        
+        for col in df.columns:
+            values = df[col].to_numpy()
+            for start in range(0, len(order), self.HASH_CHUNK_ROWS):
+                h.update(column_buffer(values[order[start:start + self.HASH_CHUNK_ROWS]]))
+        
+        return h.hexdigest()
+    
+    @staticmethod
+    def _is_strictly_increasing(key: np.ndarray) -> bool:
+        """
+        True se a chave de ordenação (`_sort_key`) já é estritamente crescente.
         
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+        Usa a mesma chave da ordenação, e não a ordem própria da coluna: texto,
+        categorias e inteiros em `object` são ordenados pela representação texto.
+        """
+        return bool(np.all(key[1:] > key[:-1]))
     
-    def _compute_stability_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Computa estatísticas de estabilidade."""
+    @staticmethod
+    def _sort_key(series: pd.Series) -> np.ndarray:
+        """Chave de ordenação de uma coluna: valores (numéricas) ou códigos ordenados do texto."""
+        values = series.to_numpy()
+        if values.dtype.kind in BINARY_KINDS:
+            return values
+        return pd.factorize(series.astype(str), sort=True)[0]
+    
+    def _compute_stability_stats(
+        self,
+        df: pd.DataFrame,
+        memory_usage: Optional[pd.Series] = None
+    ) -> Dict[str, Any]:
+        """
+        Computa estatísticas de estabilidade.
+        
+        `memory_usage` permite reaproveitar um `df.memory_usage(deep=True)` já calculado.
+        """
+        if memory_usage is None:
+            memory_usage = self.deep_memory_usage(df)
+        
+        # Nulos via `count()` (sem DataFrame booleano intermediário)
+        total_cells = len(df) * len(df.columns)
+        null_cells = total_cells - int(df.count().sum())
+        
         stats = {
             "row_count": len(df),
             "column_count": len(df.columns),
-            "total_cells": len(df) * len(df.columns),
-            "null_cells": df.isna().sum().sum(),
-            "null_percent": round(df.isna().sum().sum() / (len(df) * len(df.columns)) * 100, 2),
+            "total_cells": total_cells,
+            "null_cells": null_cells,
+            "null_percent": round(null_cells / total_cells * 100, 2) if total_cells else 0.0,
             "columns": list(df.columns),
             "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-            "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2)
+            "memory_usage_mb": round(memory_usage.sum() / 1024 / 1024, 2)
         }
         
-        # Hash por coluna (para detectar mudanças específicas)
-        column_hashes = {}
-        for col in df.columns:
-            col_content = df[col].astype(str).to_json()
-            column_hashes[col] = hashlib.md5(col_content.encode()).hexdigest()[:8]
+        # Hash por coluna (para detectar mudanças específicas): BLAKE2b de 4 bytes
+        column_hashes = {
+            col: hashlib.blake2b(column_buffer(df[col].to_numpy()), digest_size=4).hexdigest()
+            for col in df.columns
+        }
         
         stats["column_hashes"] = column_hashes
         
         return stats
 
 
+def column_buffer(values: np.ndarray):
+    """
+    Conteúdo de uma coluna para hash: buffer binário (tipos numéricos/datas)
+    ou texto UTF-8 com valores terminados por NUL (demais tipos).
+    """
+    if values.dtype.kind in BINARY_KINDS:
+        return np.ascontiguousarray(values).view(np.uint8)  # bytes crus, sem cópia extra
+    return ''.join(f'{value}\x00' for value in values).encode('utf-8')
+
+
 def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame) -> Dict[str, Any]:
     """Compara dois datasets para detectar diferenças."""
     comparison = {
@@ -168,8 +240,16 @@ def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame) -> Dict[str, Any]:
         df1_subset = df1.head(common_len).reset_index(drop=True)
         df2_subset = df2.head(common_len).reset_index(drop=True)
         
-        differences = (df1_subset != df2_subset).sum().sum()
-        comparison["cell_differences"] = int(differences)
+        # Diferenças coluna a coluna, sem DataFrame booleano intermediário
+        differences = 0
+        for pos in range(len(df1.columns)):
+            s1, s2 = df1_subset.iloc[:, pos], df2_subset.iloc[:, pos]
+            a, b = s1.to_numpy(), s2.to_numpy()
+            if a.dtype.kind in 'biufc' and b.dtype.kind in 'biufc':
+                differences += int(np.count_nonzero(a != b))
+            else:
+                differences += int((s1 != s2).sum())  # semântica de nulos do pandas
+        comparison["cell_differences"] = differences
         comparison["match_percent"] = round((1 - differences / (common_len * len(df1.columns))) * 100, 2)
     
     return comparison
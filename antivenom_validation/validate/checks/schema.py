@@ -13,6 +13,14 @@ from ..manifest import ManifestConfig
 class SchemaCheck(BaseCheck):
     """Valida estrutura de colunas do DataFrame."""
     
+    # Tipo declarado no manifest → dtypes aceitos
+    TYPE_MAPPING = {
+        'string': frozenset({'object', 'string', 'str', 'string[pyarrow]'}),
+        'float': frozenset({'float64', 'float32', 'float'}),
+        'int': frozenset({'int64', 'int32', 'int'}),
+        'bool': frozenset({'bool'})
+    }
+    
     @property
     def name(self) -> str:
         return "schema"
@@ -99,19 +107,15 @@ class SchemaCheck(BaseCheck):
         """Verifica se os tipos de dados estão corretos."""
         type_errors = []
         
-        type_mapping = {
-            'string': ['object', 'string'],
-            'float': ['float64', 'float32', 'float'],
-            'int': ['int64', 'int32', 'int'],
-            'bool': ['bool']
-        }
+        # Tipos de todas as colunas de uma vez (sem construir uma Series por coluna)
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
         
         for col_config in config.columns:
-            if col_config.name not in df.columns:
+            if col_config.name not in dtypes:
                 continue
             
-            actual_type = str(df[col_config.name].dtype)
-            expected_types = type_mapping.get(col_config.type, [col_config.type])
+            actual_type = dtypes[col_config.name]
+            expected_types = self.TYPE_MAPPING.get(col_config.type, frozenset({col_config.type}))
             
             if actual_type not in expected_types:
                 type_errors.append(self.create_error(
@@ -134,12 +138,18 @@ def validate_expected_columns(df: pd.DataFrame, config: ManifestConfig) -> list[
 
 def resolve_aliases(df: pd.DataFrame, config: ManifestConfig) -> pd.DataFrame:
     """Renomeia colunas usando aliases para nomes canônicos."""
-    df = df.copy()
+    # Montar o mapeamento completo (coluna original → nome final) e renomear uma única vez
+    mapping = {}
+    present = set(df.columns)
     
     for col_config in config.columns:
         for alias in col_config.aliases:
-            if alias in df.columns and col_config.name not in df.columns:
-                df = df.rename(columns={alias: col_config.name})
+            if alias in present and col_config.name not in present:
+                # O alias pode ser o nome dado a uma coluna por um alias anterior
+                original = next((src for src, dst in mapping.items() if dst == alias), alias)
+                mapping[original] = col_config.name
+                present.discard(alias)
+                present.add(col_config.name)
                 break
     
-    return df
+    return df.rename(columns=mapping)
@@ -2,14 +2,25 @@
 Validação de unicidade (chaves primárias).
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Optional
-from collections import Counter
 
 from .base import BaseCheck
 from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
+try:
+    import rapidfuzz.fuzz
+    import rapidfuzz.process
+except ImportError:  # dependência opcional
+    rapidfuzz = None
+
+
+# Lado dos blocos (NEAR_DUPLICATE_BLOCK × NEAR_DUPLICATE_BLOCK) da matriz de
+# similaridade calculados por vez em `find_near_duplicates`
+NEAR_DUPLICATE_BLOCK = 2048
+
 
 class UniquenessCheck(BaseCheck):
     """Valida unicidade de chaves primárias e campos únicos."""
@@ -82,21 +93,26 @@ class UniquenessCheck(BaseCheck):
             )
             return result
         
-        # Normalizar valores (limpar espaços, tabs)
-        normalized_values = values.astype(str).str.strip().str.replace(r'\s+', '', regex=True)
+        # Normalizar valores (remover todo whitespace: espaços, tabs, quebras)
+        # `''.join(s.split())` equivale a `re.sub(r'\s+', '', s)`, sem o motor de regex
+        normalized_values = pd.Series(
+            [''.join(text.split()) for text in values.astype(str).to_numpy()],
+            index=values.index
+        )
         
-        # Encontrar duplicatas
-        value_counts = Counter(normalized_values)
-        duplicates = {v: c for v, c in value_counts.items() if c > 1}
+        # Encontrar duplicatas: códigos na ordem da primeira ocorrência de cada valor
+        codes, uniques = pd.factorize(normalized_values)
+        counts = np.bincount(codes, minlength=len(uniques))
+        is_dup_code = counts > 1
         
-        if duplicates:
-            # Encontrar índices das duplicatas
-            dup_indices = []
-            for value in duplicates.keys():
-                indices = df[normalized_values.reindex(df.index).fillna('') == value].index.tolist()
-                dup_indices.extend(indices)
+        if is_dup_code.any():
+            # Índices das duplicatas agrupados por valor (ordem estável dentro de cada grupo)
+            dup_mask = is_dup_code[codes]
+            group_order = np.argsort(codes[dup_mask], kind='stable')
+            dup_indices = values.index[dup_mask][group_order].tolist()
             
-            total_dup_records = sum(duplicates.values())
+            duplicates = pd.Series(counts[is_dup_code], index=uniques[is_dup_code])
+            total_dup_records = int(duplicates.sum())
             unique_dup_values = len(duplicates)
             
             # Determinar severidade
@@ -119,8 +135,8 @@ class UniquenessCheck(BaseCheck):
                         "unique_duplicate_values": unique_dup_values,
                         "duplicate_percent": round(dup_percent, 2),
                         "top_duplicates": [
-                            {"value": v, "count": c}
-                            for v, c in sorted(duplicates.items(), key=lambda x: -x[1])[:10]
+                            {"value": v, "count": int(c)}
+                            for v, c in duplicates.sort_values(ascending=False, kind='stable').head(10).items()
                         ]
                     }
                 )
@@ -139,11 +155,9 @@ class UniquenessCheck(BaseCheck):
         """Valida unicidade de chave composta."""
         result = {'errors': [], 'warnings': [], 'info': []}
         
-        # Criar chave composta
-        composite_key = df[columns].astype(str).agg('|'.join, axis=1)
-        
-        # Encontrar duplicatas
-        duplicates = df[composite_key.duplicated(keep=False)]
+        # Encontrar duplicatas da chave composta (valores comparados como texto,
+        # coluna a coluna, sem montar uma string por linha)
+        duplicates = df[df[columns].astype(str).duplicated(keep=False)]
         
         if len(duplicates) > 0:
             dup_indices = duplicates.index.tolist()
@@ -164,10 +178,20 @@ class UniquenessCheck(BaseCheck):
 
 
 def find_near_duplicates(df: pd.DataFrame, column: str, threshold: float = 0.9) -> List[tuple]:
-    """Encontra valores quase duplicados usando similaridade."""
-    from difflib import SequenceMatcher
+    """
+    Encontra valores quase duplicados usando similaridade.
     
+    Usa `rapidfuzz` (comparações em C++, multi-thread) quando instalado; caso
+    contrário, `difflib.SequenceMatcher` par a par. As duas métricas de
+    similaridade são próximas, mas não idênticas.
+    """
     values = df[column].dropna().unique().tolist()
+    
+    if rapidfuzz is not None:
+        return _near_duplicates_rapidfuzz(values, threshold)
+    
+    from difflib import SequenceMatcher
+    
     near_duplicates = []
     
     for i, v1 in enumerate(values):
@@ -177,3 +201,35 @@ def find_near_duplicates(df: pd.DataFrame, column: str, threshold: float = 0.9)
                 near_duplicates.append((v1, v2, round(similarity, 3)))
     
     return sorted(near_duplicates, key=lambda x: -x[2])
+
+
+def _near_duplicates_rapidfuzz(values: list, threshold: float) -> List[tuple]:
+    """
+    `find_near_duplicates` com `rapidfuzz.process.cdist`, em blocos quadrados
+    sobre a parte da matriz acima da diagonal (memória limitada pelo bloco).
+    """
+    texts = [str(v) for v in values]
+    cutoff = threshold * 100
+    block = NEAR_DUPLICATE_BLOCK
+    pairs = []
+    
+    for row_start in range(0, len(texts), block):
+        row_texts = texts[row_start:row_start + block]
+        for col_start in range(row_start, len(texts), block):
+            # `score_cutoff` zera os pares abaixo do limite: basta `np.nonzero`
+            scores = rapidfuzz.process.cdist(
+                row_texts,
+                texts[col_start:col_start + block],
+                scorer=rapidfuzz.fuzz.ratio,
+                score_cutoff=cutoff,
+                workers=-1
+            )
+            rows, cols = np.nonzero(scores)
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                i, j = row + row_start, col + col_start
+                if i < j and values[i] != values[j]:
+                    pairs.append((i, j, round(float(scores[row, col]) / 100, 3)))
+    
+    # Mesma ordem da varredura linha a linha: similaridade, depois posição
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return [(values[i], values[j], similarity) for i, j, similarity in pairs]
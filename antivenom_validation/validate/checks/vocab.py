@@ -2,18 +2,32 @@
 Validação de vocabulários controlados.
 """
 
+import numpy as np
 import pandas as pd
 import unicodedata
+from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
 from .base import BaseCheck
 from ..models import ValidationResult, ValidationError, Severity
 from ..manifest import ManifestConfig
 
+try:
+    import rapidfuzz.fuzz
+    import rapidfuzz.process
+except ImportError:  # dependência opcional
+    rapidfuzz = None
+
 
 class VocabCheck(BaseCheck):
     """Valida valores contra vocabulários controlados."""
     
+    STREAMABLE = True
+    
+    # Máximo de linhas listadas por achado
+    MAX_ROWS_REPORTED = 50
+    
     @property
     def name(self) -> str:
         return "vocab"
@@ -27,21 +41,20 @@ class VocabCheck(BaseCheck):
         warnings = []
         info = []
         
+        # Lista de destino de cada severidade
+        buckets = {
+            Severity.BLOCKER: errors,
+            Severity.MAJOR: errors,
+            Severity.MINOR: warnings,
+            Severity.INFO: info
+        }
+        
         for col_name, vocab_config in config.controlled_vocab.items():
             if col_name not in df.columns:
                 continue
             
             result = self._check_vocabulary(df, col_name, vocab_config)
-            
-            severity = Severity[vocab_config.severity]
-            if severity == Severity.BLOCKER:
-                errors.extend(result)
-            elif severity == Severity.MAJOR:
-                errors.extend(result)
-            elif severity == Severity.MINOR:
-                warnings.extend(result)
-            else:
-                info.extend(result)
+            buckets[vocab_config.severity_level].extend(result)
         
         passed = len(errors) == 0
         
@@ -53,49 +66,111 @@ class VocabCheck(BaseCheck):
             info=info
         )
     
+    def reset_stream(self) -> None:
+        super().reset_stream()
+        # Valores inválidos acumulados por coluna no modo streaming (ver `run_chunk`)
+        self._stream_invalid = {}
+    
+    def run_chunk(self, df: pd.DataFrame, config: ManifestConfig) -> ValidationResult:
+        """
+        Acumula os valores inválidos do bloco; os achados são montados uma
+        única vez, sobre todos os blocos, em `merge_results`.
+        """
+        for col_name, vocab_config in config.controlled_vocab.items():
+            if col_name not in df.columns:
+                continue
+            
+            invalid_indices, invalid_values = self._invalid_values(df, col_name, vocab_config)
+            acc = self._stream_invalid.setdefault(col_name, {'indices': [], 'total': 0, 'values': Counter()})
+            acc['indices'].extend(invalid_indices[:self.MAX_ROWS_REPORTED - len(acc['indices'])])
+            acc['total'] += len(invalid_indices)
+            acc['values'].update(invalid_values)  # novos rótulos entram na ordem de ocorrência
+        
+        return ValidationResult(category=self.name, passed=True)
+    
+    def merge_results(self, results: list[ValidationResult], config: ManifestConfig) -> ValidationResult:
+        """Achados sobre todos os blocos, a partir dos valores inválidos acumulados por `run_chunk`."""
+        merged = ValidationResult.merge(results)  # tempos e eventuais falhas de execução dos blocos
+        
+        buckets = {
+            Severity.BLOCKER: merged.errors,
+            Severity.MAJOR: merged.errors,
+            Severity.MINOR: merged.warnings,
+            Severity.INFO: merged.info
+        }
+        
+        for col_name, acc in self._stream_invalid.items():
+            vocab_config = config.controlled_vocab[col_name]
+            buckets[vocab_config.severity_level].extend(
+                self._vocabulary_errors(col_name, vocab_config, acc['indices'], acc['total'], acc['values'])
+            )
+        
+        merged.passed = len(merged.errors) == 0
+        return merged
+    
     def _check_vocabulary(self, df: pd.DataFrame, col_name: str, vocab_config) -> list[ValidationError]:
         """Verifica valores contra vocabulário permitido."""
-        errors = []
+        invalid_indices, invalid_values = self._invalid_values(df, col_name, vocab_config)
+        return self._vocabulary_errors(col_name, vocab_config, invalid_indices, len(invalid_indices), invalid_values)
+    
+    def _invalid_values(self, df: pd.DataFrame, col_name: str, vocab_config) -> tuple[list, Counter]:
+        """Índices das linhas inválidas e contagem por valor inválido (ordem da primeira ocorrência)."""
+        # Já normalizado (minúsculas se não é case sensitive) e cacheado no VocabConfig
+        allowed_values = vocab_config.allowed_values
         
-        allowed_values = set(vocab_config.values)
+        # Normalizar apenas os valores distintos (colunas de baixa cardinalidade)
+        codes, uniques = distinct_text(df[col_name])
+        null_mask = codes == -1
         
-        # Se não é case sensitive, normalizar
-        if not vocab_config.case_sensitive:
-            allowed_values = {v.lower() for v in allowed_values}
+        text = pd.Index(uniques, dtype=object).str.strip()
+        check_text = text if vocab_config.case_sensitive else text.str.lower()
+        invalid_unique = ~check_text.isin(allowed_values)
         
-        invalid_values = {}
-        invalid_indices = []
+        invalid_mask = null_mask.copy() if not vocab_config.allow_null else np.zeros(len(codes), dtype=bool)
+        invalid_mask[~null_mask] = invalid_unique[codes[~null_mask]]
         
-        for idx, val in df[col_name].items():
-            if pd.isna(val):
-                if not vocab_config.allow_null:
-                    invalid_indices.append(idx)
-                    invalid_values[str(val)] = invalid_values.get(str(val), 0) + 1
-                continue
-            
-            val_str = str(val).strip()
-            check_val = val_str if vocab_config.case_sensitive else val_str.lower()
-            
-            if check_val not in allowed_values:
-                invalid_indices.append(idx)
-                invalid_values[val_str] = invalid_values.get(val_str, 0) + 1
+        # Rótulo de cada valor inválido no relatório: texto sem espaços ou str() do nulo
+        labels = np.empty(len(codes), dtype=object)
+        labels[~null_mask] = text.to_numpy(dtype=object)[codes[~null_mask]]
+        null_invalid = null_mask & invalid_mask
+        labels[null_invalid] = [str(val) for val in df[col_name].to_numpy(dtype=object)[null_invalid]]
+        
+        invalid_indices = df.index[invalid_mask].tolist()
+        
+        # Contagem por rótulo, na ordem da primeira ocorrência
+        label_codes, label_uniques = pd.factorize(labels[invalid_mask])
+        counts = np.bincount(label_codes, minlength=len(label_uniques))
+        invalid_values = Counter(dict(zip(label_uniques.tolist(), counts.tolist())))
         
-        if invalid_indices:
-            # Ordenar valores inválidos por frequência
-            sorted_invalid = sorted(invalid_values.items(), key=lambda x: -x[1])
+        return invalid_indices, invalid_values
+    
+    def _vocabulary_errors(
+        self,
+        col_name: str,
+        vocab_config,
+        invalid_indices: list,
+        total_invalid: int,
+        invalid_values: Counter
+    ) -> list[ValidationError]:
+        """Erro de vocabulário da coluna (`invalid_indices` pode trazer só as primeiras linhas)."""
+        errors = []
+        
+        if total_invalid:
+            # 20 valores inválidos mais frequentes (empates na ordem da primeira ocorrência)
+            top_invalid = invalid_values.most_common(20)
             
             errors.append(
                 self.create_error(
-                    severity=Severity[vocab_config.severity],
-                    message=f"'{col_name}' contém {len(invalid_indices)} valores fora do vocabulário",
+                    severity=vocab_config.severity_level,
+                    message=f"'{col_name}' contém {total_invalid} valores fora do vocabulário",
                     column=col_name,
-                    row_indices=invalid_indices[:50],
+                    row_indices=invalid_indices[:self.MAX_ROWS_REPORTED],
                     expected=list(vocab_config.values)[:10],
-                    actual=sorted_invalid[:10],
+                    actual=top_invalid[:10],
                     details={
-                        "total_invalid": len(invalid_indices),
+                        "total_invalid": total_invalid,
                         "unique_invalid": len(invalid_values),
-                        "invalid_values": dict(sorted_invalid[:20])
+                        "invalid_values": dict(top_invalid)
                     }
                 )
             )
@@ -103,24 +178,42 @@ class VocabCheck(BaseCheck):
         return errors
 
 
+def distinct_text(series: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Códigos por linha (-1 = nulo) e representações `str()` distintas de uma coluna.
+    
+    Colunas categóricas reaproveitam os códigos existentes, sem varrer as linhas.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        return series.cat.codes.to_numpy(), np.array([str(c) for c in categories], dtype=object)
+    
+    null_mask = series.isna().to_numpy()
+    codes = np.full(len(series), -1, dtype=np.intp)
+    present_codes, uniques = pd.factorize(series[~null_mask].astype(str))
+    codes[~null_mask] = present_codes
+    return codes, np.asarray(uniques, dtype=object)
+
+
 def get_invalid_values(series: pd.Series, vocab: list[str], case_sensitive: bool = True) -> set:
     """Retorna valores que não estão no vocabulário."""
     allowed = set(vocab) if case_sensitive else {v.lower() for v in vocab}
     
-    invalid = set()
-    for val in series.dropna().unique():
-        check_val = str(val) if case_sensitive else str(val).lower()
-        if check_val not in allowed:
-            invalid.add(val)
+    # Comparar apenas os valores distintos, com operações vetorizadas de texto
+    uniques = series.dropna().unique()
+    check_text = pd.Index([str(val) for val in uniques], dtype=object)
+    if not case_sensitive:
+        check_text = check_text.str.lower()
     
-    return invalid
+    return set(uniques[~check_text.isin(allowed)])
 
 
 def normalize_for_comparison(value: str, remove_accents: bool = False, lowercase: bool = False) -> str:
     """Normaliza valor para comparação."""
     result = str(value).strip()
     
-    if remove_accents:
+    # Texto ASCII não tem acentos: a decomposição NFD não mudaria nada
+    if remove_accents and not result.isascii():
         result = ''.join(
             c for c in unicodedata.normalize('NFD', result)
             if unicodedata.category(c) != 'Mn'
@@ -133,20 +226,89 @@ def normalize_for_comparison(value: str, remove_accents: bool = False, lowercase
 
 
 def fuzzy_match(value: str, vocab: list[str], threshold: float = 0.8) -> Optional[str]:
-    """Encontra a melhor correspondência aproximada no vocabulário."""
-    from difflib import SequenceMatcher
+    """
+    Encontra a melhor correspondência aproximada no vocabulário.
     
-    value_normalized = normalize_for_comparison(value, remove_accents=True, lowercase=True)
+    O vocabulário é preparado uma única vez (ver `FuzzyVocab`) e reaproveitado
+    nas chamadas seguintes com o mesmo `vocab`.
+    """
+    return _get_fuzzy_vocab(tuple(vocab)).match(value, threshold)
+
+
+class FuzzyVocab:
+    """
+    Vocabulário pré-normalizado para buscas aproximadas repetidas.
     
-    best_match = None
-    best_ratio = 0
+    Usa `rapidfuzz.process.extractOne` quando instalado; caso contrário,
+    `difflib.SequenceMatcher` item a item. Com `threshold == 1.0` só a
+    igualdade (após normalização) é aceita, resolvida por busca em dicionário.
+    """
     
-    for v in vocab:
-        v_normalized = normalize_for_comparison(v, remove_accents=True, lowercase=True)
-        ratio = SequenceMatcher(None, value_normalized, v_normalized).ratio()
+    def __init__(self, vocab):
+        self.raw = list(vocab)
+        self.normalized = [
+            normalize_for_comparison(v, remove_accents=True, lowercase=True) for v in self.raw
+        ]
         
-        if ratio > best_ratio and ratio >= threshold:
-            best_ratio = ratio
-            best_match = v
+        # Valor normalizado -> primeiro item do vocabulário com essa forma
+        self.exact = {}
+        for v, v_normalized in zip(self.raw, self.normalized):
+            self.exact.setdefault(v_normalized, v)
     
-    return best_match
+    def match(self, value: str, threshold: float = 0.8) -> Optional[str]:
+        """Melhor item do vocabulário com similaridade >= `threshold` (ou None)."""
+        value_normalized = normalize_for_comparison(value, remove_accents=True, lowercase=True)
+        
+        if threshold == 1.0:
+            return self.exact.get(value_normalized)
+        
+        if rapidfuzz is not None:
+            match = rapidfuzz.process.extractOne(
+                value_normalized,
+                self.normalized,
+                scorer=rapidfuzz.fuzz.ratio,
+                score_cutoff=threshold * 100
+            )
+            # Mesmo critério do laço abaixo: similaridade zero nunca é correspondência
+            if match is None or match[1] <= 0:
+                return None
+            return self.raw[match[2]]
+        
+        from difflib import SequenceMatcher
+        
+        best_match = None
+        best_ratio = 0
+        
+        # Um único SequenceMatcher: o valor fica fixo em `a`, só `b` troca a cada item
+        matcher = SequenceMatcher(None)
+        matcher.set_seq1(value_normalized)
+        
+        for v, v_normalized in zip(self.raw, self.normalized):
+            # Limite superior da similaridade pelos comprimentos (como `real_quick_ratio`):
+            # descarta o item sem montar o SequenceMatcher
+            total_len = len(value_normalized) + len(v_normalized)
+            if total_len:
+                upper_bound = 2 * min(len(value_normalized), len(v_normalized)) / total_len
+                if upper_bound < threshold or upper_bound <= best_ratio:
+                    continue
+            
+            matcher.set_seq2(v_normalized)
+            
+            # `quick_ratio` (contagem de caracteres, O(n+m)) também é limite superior
+            quick = matcher.quick_ratio()
+            if quick < threshold or quick <= best_ratio:
+                continue
+            
+            ratio = matcher.ratio()
+            
+            if ratio > best_ratio and ratio >= threshold:
+                best_ratio = ratio
+                best_match = v
+        
+        return best_match
+
+
+@lru_cache(maxsize=64)
+def _get_fuzzy_vocab(vocab: tuple) -> FuzzyVocab:
+    """`FuzzyVocab` de um vocabulário, construído uma vez por vocabulário distinto."""
+    return FuzzyVocab(vocab)
@@ -4,6 +4,7 @@ CLI - Interface de linha de comando.
 
 import argparse
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
@@ -55,6 +56,13 @@ def create_parser() -> argparse.ArgumentParser:
         help='Modo verboso'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Lê CSVs em blocos e roda só os checks linha a linha (menos memória); '
+             'os demais ficam como não executados e o resultado não passa'
+    )
+    
     parser.add_argument(
         '--fail-on-warning',
         action='store_true',
@@ -102,7 +110,8 @@ def main(args: Optional[List[str]] = None) -> int:
             file_path=str(input_path),
             manifest_path=parsed.manifest,
             skip_checks=parsed.skip,
-            output_dir=str(output_dir)
+            output_dir=str(output_dir),
+            stream=parsed.stream
         )
         
         stats = get_summary_stats(report)
@@ -110,13 +119,15 @@ def main(args: Optional[List[str]] = None) -> int:
         # Gerar relatórios
         from reporting import generate_json_report, generate_markdown_reports
         
+        run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
         if parsed.format in ['json', 'both']:
-            json_path = generate_json_report(report, output_dir)
+            json_path = generate_json_report(report, output_dir, timestamp=run_ts)
             if parsed.verbose:
                 print(f"📄 JSON: {json_path}")
         
         if parsed.format in ['markdown', 'both']:
-            md_paths = generate_markdown_reports(report, output_dir)
+            md_paths = generate_markdown_reports(report, output_dir, timestamp=run_ts)
             if parsed.verbose:
                 print(f"📝 Markdown: {len(md_paths)} arquivos gerados")
         
@@ -140,7 +151,12 @@ def main(args: Optional[List[str]] = None) -> int:
 
 def print_summary(stats: dict, verbose: bool = False):
     """Imprime resumo da validação."""
-    status = "✅ PASSOU" if stats['passed'] else "❌ FALHOU"
+    if stats['passed']:
+        status = "✅ PASSOU"
+    elif stats['failed_checks'] == 0:
+        status = "⚠️ INCOMPLETO"  # nenhum check falhou, mas algum não foi executado
+    else:
+        status = "❌ FALHOU"
     
     print(f"\n{'='*50}")
     print(f"  RESULTADO: {status}")
@@ -150,6 +166,8 @@ def print_summary(stats: dict, verbose: bool = False):
     print(f"   • Checks executados: {stats['total_checks']}")
     print(f"   • Passou: {stats['passed_checks']}")
     print(f"   • Falhou: {stats['failed_checks']}")
+    if stats['skipped_checks']:
+        print(f"   • Não executados: {stats['skipped_checks']}")
     
     print(f"\n📈 Ocorrências:")
     print(f"   • Erros: {stats['total_errors']}")
@@ -0,0 +1,51 @@
+"""
+Escolha dos engines de leitura de arquivos (dependências opcionais).
+
+Compartilhado por `runner.load_dataframe` e `checks.perf.measure_load_time`.
+
+Atenção: o engine `pyarrow` infere tipos de forma diferente do parser C
+padrão do pandas (por exemplo, datas ISO viram `datetime64` em vez de
+texto). Como a leitura em blocos (`runner.iter_csv_chunks`, `--stream`) usa
+sempre o parser C, os dtypes podem diferir entre os dois modos.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+# Engines de leitura mais rápidas (dependências opcionais)
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# `read_excel(engine='calamine')` existe a partir do pandas 2.2
+CALAMINE_MIN_PANDAS = (2, 2)
+
+
+def pandas_version() -> tuple[int, int]:
+    """Versão (major, minor) do pandas instalado."""
+    major, minor = pd.__version__.split('.')[:2]
+    return int(major), int(minor)
+
+
+def excel_engine(suffix: str) -> Optional[str]:
+    """
+    Engine de `pd.read_excel` para a extensão `suffix` ('.xlsx' ou '.xls').
+    
+    `calamine` se `python-calamine` estiver instalado e o pandas suportar;
+    senão `openpyxl` para .xlsx e o padrão do pandas (None) para os demais.
+    """
+    if python_calamine is not None and pandas_version() >= CALAMINE_MIN_PANDAS:
+        return 'calamine'
+    return 'openpyxl' if suffix.lower() == '.xlsx' else None
+
+
+def csv_engine() -> Optional[str]:
+    """Engine de `pd.read_csv`: `pyarrow` (parser multi-thread) se instalado, senão o padrão."""
+    return 'pyarrow' if pyarrow is not None else None
@@ -2,10 +2,18 @@
 Parser e validador do manifest YAML.
 """
 
+import copy
 import yaml
 from pathlib import Path
+from types import MappingProxyType
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from functools import cached_property, lru_cache
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from .models import Severity
+
+# Loader C da libyaml (bem mais rápido); recorre ao loader Python se indisponível
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 
 @dataclass
@@ -28,6 +36,11 @@ class ConstraintConfig:
     allow_empty: bool = False
     allow_special_values: list[str] = field(default_factory=list)
     severity: str = "MAJOR"
+    
+    @cached_property
+    def severity_level(self) -> Severity:
+        """`severity` resolvida para o enum, uma única vez."""
+        return Severity[self.severity]
 
 
 @dataclass
@@ -37,6 +50,18 @@ class VocabConfig:
     case_sensitive: bool = True
     allow_null: bool = False
     severity: str = "MAJOR"
+    
+    @cached_property
+    def severity_level(self) -> Severity:
+        """`severity` resolvida para o enum, uma única vez."""
+        return Severity[self.severity]
+    
+    @cached_property
+    def allowed_values(self) -> frozenset:
+        """Valores permitidos já normalizados (minúsculos se não é case sensitive), calculados uma vez."""
+        if self.case_sensitive:
+            return frozenset(self.values)
+        return frozenset(v.lower() for v in self.values)
 
 
 @dataclass
@@ -84,8 +109,8 @@ class ManifestConfig:
     reports_dir: str = "reports"
     
     # Mapeamentos carregados
-    fu_to_state: dict[str, list[str]] = field(default_factory=dict)
-    fu_to_region: dict[str, list[str]] = field(default_factory=dict)
+    fu_to_state: Mapping[str, Sequence[str]] = field(default_factory=dict)
+    fu_to_region: Mapping[str, Sequence[str]] = field(default_factory=dict)
     
     # Propriedades de compatibilidade
     @property
@@ -108,9 +133,10 @@ class ManifestConfig:
     def expected_rows(self) -> Optional[int]:
         return None
     
-    @property
-    def expected_columns(self) -> Optional[list]:
-        return [col.name for col in self.columns] if self.columns else None
+    @cached_property
+    def expected_columns(self) -> Optional[tuple[str, ...]]:
+        # Calculado no primeiro acesso (após `load_manifest` preencher `columns`)
+        return tuple(col.name for col in self.columns) if self.columns else None
     
     @property
     def perf_thresholds(self) -> Optional[dict]:
@@ -132,8 +158,7 @@ def load_manifest(path: str) -> ManifestConfig:
     if not manifest_path.exists():
         raise FileNotFoundError(f"Manifest não encontrado: {path}")
     
-    with open(manifest_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(manifest_path)
     
     config = ManifestConfig(
         input_file=data.get('input', {}).get('file_path', ''),
@@ -213,17 +238,55 @@ def load_manifest(path: str) -> ManifestConfig:
     
     fu_state_path = mappings_dir / 'fu_to_state.yaml'
     if fu_state_path.exists():
-        with open(fu_state_path, 'r', encoding='utf-8') as f:
-            config.fu_to_state = yaml.safe_load(f) or {}
+        config.fu_to_state = load_mapping_yaml(fu_state_path)
     
     fu_region_path = mappings_dir / 'fu_to_region.yaml'
     if fu_region_path.exists():
-        with open(fu_region_path, 'r', encoding='utf-8') as f:
-            config.fu_to_region = yaml.safe_load(f) or {}
+        config.fu_to_region = load_mapping_yaml(fu_region_path)
     
     return config
 
 
+def load_yaml(path: Union[str, Path]) -> Any:
+    """
+    Carrega um arquivo YAML com o loader C da libyaml, se disponível.
+    
+    O conteúdo parseado fica em cache por (caminho, mtime); cada chamada
+    recebe uma cópia, que pode ser alterada livremente.
+    """
+    path = Path(path)
+    return copy.deepcopy(_parse_yaml(str(path.resolve()), path.stat().st_mtime_ns))
+
+
+@lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime_ns: int) -> Any:
+    """Parseia o YAML (`mtime_ns` só invalida o cache quando o arquivo muda)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+def load_mapping_yaml(path: Union[str, Path]) -> Mapping[str, Sequence[str]]:
+    """
+    Carrega um YAML de mapeamento (ex.: `fu_to_state.yaml`) como mapeamento somente leitura.
+    
+    Ao contrário de `load_yaml`, não copia: o mesmo objeto em cache (listas
+    convertidas em tuplas) é compartilhado entre execuções enquanto o arquivo
+    não muda.
+    """
+    path = Path(path)
+    return _parse_mapping(str(path.resolve()), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _parse_mapping(path: str, mtime_ns: int) -> Mapping[str, Sequence[str]]:
+    """Parseia e congela um YAML de mapeamento (cache por caminho e `mtime_ns`)."""
+    data = _parse_yaml(path, mtime_ns) or {}
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in data.items()
+    })
+
+
 def get_default_manifest() -> dict:
     """Retorna um manifest padrão."""
     return {
@@ -2,7 +2,9 @@
 Modelos de dados para a suite de validação.
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
+from itertools import chain
 from enum import Enum
 from typing import Any, Optional
 from datetime import datetime
@@ -20,7 +22,7 @@ class Severity(Enum):
         return order.index(self) < order.index(other)
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationError:
     """Representa um erro individual de validação."""
     severity: Severity
@@ -54,11 +56,24 @@ class ValidationResult:
     warnings: list[ValidationError] = field(default_factory=list)
     info: list[ValidationError] = field(default_factory=list)
     duration_seconds: float = 0.0
+    skipped: bool = False  # check não executado (ex.: modo streaming); nunca conta como aprovado
     
     @property
     def total_issues(self) -> int:
         return len(self.errors) + len(self.warnings) + len(self.info)
     
+    @classmethod
+    def merge(cls, results: list['ValidationResult']) -> 'ValidationResult':
+        """Junta resultados parciais de um mesmo check (ex.: um por bloco de linhas)."""
+        return cls(
+            category=results[0].category,
+            passed=all(r.passed for r in results),
+            errors=[e for r in results for e in r.errors],
+            warnings=[w for r in results for w in r.warnings],
+            info=[i for r in results for i in r.info],
+            duration_seconds=sum(r.duration_seconds for r in results)
+        )
+    
     def to_dict(self) -> dict:
         def convert_error(e):
             return e.to_dict() if hasattr(e, 'to_dict') else e
@@ -69,7 +84,8 @@ class ValidationResult:
             "errors": [convert_error(e) for e in self.errors],
             "warnings": [convert_error(e) for e in self.warnings],
             "info": [convert_error(e) for e in self.info],
-            "duration_seconds": self.duration_seconds
+            "duration_seconds": self.duration_seconds,
+            "skipped": self.skipped
         }
 
 
@@ -115,31 +131,22 @@ class ValidationReport:
     def passed_checks(self) -> int:
         return sum(1 for r in self.results if r.passed)
     
+    @property
+    def skipped_checks(self) -> int:
+        return sum(1 for r in self.results if r.skipped)
+    
     @property
     def failed_checks(self) -> int:
-        return self.total_checks - self.passed_checks
+        return self.total_checks - self.passed_checks - self.skipped_checks
     
     def count_by_severity(self) -> dict[str, int]:
+        # Uma única passada sobre erros, warnings e info de todos os resultados
+        items = chain.from_iterable(
+            chain(result.errors, result.warnings, result.info) for result in self.results
+        )
         counts = {s.value: 0 for s in Severity}
-        for result in self.results:
-            for error in result.errors:
-                severity = error.severity if hasattr(error, 'severity') else error.get('severity', 'UNKNOWN')
-                if hasattr(severity, 'value'):
-                    counts[severity.value] += 1
-                else:
-                    counts[str(severity)] = counts.get(str(severity), 0) + 1
-            for warning in result.warnings:
-                severity = warning.severity if hasattr(warning, 'severity') else warning.get('severity', 'UNKNOWN')
-                if hasattr(severity, 'value'):
-                    counts[severity.value] += 1
-                else:
-                    counts[str(severity)] = counts.get(str(severity), 0) + 1
-            for info in result.info:
-                severity = info.severity if hasattr(info, 'severity') else info.get('severity', 'UNKNOWN')
-                if hasattr(severity, 'value'):
-                    counts[severity.value] += 1
-                else:
-                    counts[str(severity)] = counts.get(str(severity), 0) + 1
+        for severity, n in Counter(map(severity_name, items)).items():
+            counts[severity] = counts.get(severity, 0) + n
         return counts
     
     @property
@@ -150,7 +157,14 @@ class ValidationReport:
     def has_majors(self) -> bool:
         return self.count_by_severity()["MAJOR"] > 0
     
-    def to_dict(self) -> dict:
+    def to_dict(self, convert_results: bool = True) -> dict:
+        """
+        Relatório como dict.
+        
+        Com `convert_results=False`, `results` mantém os próprios
+        `ValidationResult`/`ValidationError` (dataclasses), que o `orjson`
+        serializa diretamente, sem os dicts intermediários de `to_dict`.
+        """
         severity_counts = self.count_by_severity()
         return {
             "metadata": {
@@ -166,9 +180,16 @@ class ValidationReport:
                 "total_checks": self.total_checks,
                 "passed": self.passed_checks,
                 "failed": self.failed_checks,
+                "skipped": self.skipped_checks,
                 "by_severity": severity_counts,
                 "pass_rate": self.passed_checks / self.total_checks if self.total_checks > 0 else 0
             },
             "data_quality": self.data_quality,
-            "results": [r.to_dict() for r in self.results]
+            "results": [r.to_dict() for r in self.results] if convert_results else self.results
         }
+
+
+def severity_name(item) -> str:
+    """Severidade de um erro (ValidationError ou dict) como string."""
+    severity = item.severity if hasattr(item, 'severity') else item.get('severity', 'UNKNOWN')
+    return severity.value if hasattr(severity, 'value') else str(severity)
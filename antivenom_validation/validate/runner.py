@@ -2,20 +2,31 @@
 Runner principal - orquestra execução dos checks.
 """
 
+import os
 import pandas as pd
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Type, Dict, Any
+from typing import List, Optional, Type, Dict, Any, Iterable, Iterator
 from datetime import datetime
 import time
 
-from .models import ValidationReport, ValidationResult, Severity
+from .models import ValidationReport, ValidationResult, Severity, severity_name
 from .manifest import ManifestConfig, load_manifest
 from .checks import ALL_CHECKS, BaseCheck
+from .engines import csv_engine, excel_engine
 
 
 class ValidationRunner:
     """Orquestra execução de validações."""
     
+    # Checks só rodam em paralelo a partir deste número de linhas
+    PARALLEL_MIN_ROWS = BaseCheck.PARALLEL_MIN_ROWS
+    MAX_CHECK_WORKERS = 4
+    
+    # Linhas por bloco na leitura em streaming (`run_validation(stream=True)`)
+    STREAM_CHUNK_ROWS = 200_000
+    
     def __init__(
         self,
         config: Optional[ManifestConfig] = None,
@@ -27,39 +38,37 @@ class ValidationRunner:
         self.skip_checks = skip_checks or []
     
     def run(self, df: pd.DataFrame) -> ValidationReport:
-        """Executa todas as validações."""
+        """
+        Executa todas as validações.
+        
+        Os checks são independentes e apenas leem `df`; em DataFrames grandes
+        (e com mais de uma CPU) rodam em um pool de threads, sem paralelizar os
+        próprios sub-checks. Checks `RUN_ALONE` rodam depois, sozinhos. Os
+        resultados seguem a ordem de `self.checks`.
+        """
         start_time = time.perf_counter()
-        results = []
+        checks = self._create_checks(context={})  # cache compartilhado entre os checks
         
-        for check_class in self.checks:
-            check = check_class()
-            
-            if check.name in self.skip_checks:
-                continue
-            
-            try:
-                result = check.timed_run(df, self.config)
-                results.append(result)
-            except Exception as e:
-                # Captura erro e cria resultado de falha
-                import traceback
-                tb_str = traceback.format_exc()
-                results.append(
-                    ValidationResult(
-                        category=check.name,
-                        passed=False,
-                        errors=[{
-                            "severity": Severity.BLOCKER.value,
-                            "message": f"Erro na execução do check: {str(e)}",
-                            "details": {
-                                "exception": str(type(e).__name__),
-                                "traceback": tb_str
-                            }
-                        }],
-                        warnings=[],
-                        info=[]
-                    )
-                )
+        pooled = [check for check in checks if not check.RUN_ALONE]
+        workers = min(self.MAX_CHECK_WORKERS, len(pooled), os.cpu_count() or 1)
+        
+        done = {}
+        if workers < 2 or len(df) < self.PARALLEL_MIN_ROWS:
+            for check in pooled:
+                done[check] = self._run_check(check, df)
+        else:
+            for check in pooled:
+                check.parallel_subchecks = False
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {check: executor.submit(self._run_check, check, df) for check in pooled}
+                for check, future in futures.items():
+                    done[check] = future.result()
+        
+        for check in checks:
+            if check.RUN_ALONE:
+                done[check] = self._run_check(check, df)
+        
+        results = [done[check] for check in checks]
         
         total_time = time.perf_counter() - start_time
         
@@ -75,6 +84,96 @@ class ValidationRunner:
             duration_seconds=round(total_time, 3)
         )
     
+    def run_chunks(self, chunks: Iterable[pd.DataFrame]) -> ValidationReport:
+        """
+        Executa as validações bloco a bloco, sem materializar o dataset inteiro.
+        
+        Só os checks `STREAMABLE` (que avaliam cada linha isoladamente) rodam,
+        via `run_chunk`; seus resultados por bloco são combinados pelo próprio
+        check (`merge_results`).
+        Os demais precisam do dataset completo e são reportados como não
+        executados (`skipped`, sem aprovação): o relatório não passa sem eles.
+        """
+        start_time = time.perf_counter()
+        checks = self._create_checks(context=None)
+        streamed = [check for check in checks if check.STREAMABLE]
+        partials = {check.name: [] for check in streamed}
+        for check in streamed:
+            check.reset_stream()
+        row_count = 0
+        column_count = 0
+        
+        for chunk in chunks:
+            row_count += len(chunk)
+            column_count = len(chunk.columns)
+            for check in streamed:
+                partials[check.name].append(self._run_check(check, chunk, chunk=True))
+        
+        results = []
+        for check in checks:
+            if check.STREAMABLE:
+                if partials[check.name]:
+                    results.append(check.merge_results(partials[check.name], self.config))
+                continue
+            
+            results.append(ValidationResult(
+                category=check.name,
+                passed=False,
+                warnings=[check.create_error(
+                    severity=Severity.MINOR,
+                    message="Check não executado em modo streaming (requer o dataset completo)"
+                )],
+                skipped=True
+            ))
+        
+        total_time = time.perf_counter() - start_time
+        
+        return ValidationReport(
+            timestamp=datetime.now(),
+            data_file=self.config.input_file or "unknown",
+            row_count=row_count,
+            column_count=column_count,
+            results=results,
+            duration_seconds=round(total_time, 3)
+        )
+    
+    def _create_checks(self, context: Optional[dict]) -> List[BaseCheck]:
+        """Instancia os checks habilitados (fora de `skip_checks`), na ordem de `self.checks`."""
+        checks = []
+        for check_class in self.checks:
+            check = check_class()
+            
+            if check.name in self.skip_checks:
+                continue
+            
+            check.context = context
+            checks.append(check)
+        
+        return checks
+    
+    def _run_check(self, check: BaseCheck, df: pd.DataFrame, chunk: bool = False) -> ValidationResult:
+        """Executa um check (ou um bloco, com `chunk=True`), convertendo exceções em resultado de falha."""
+        try:
+            return check.timed_run(df, self.config, chunk=chunk)
+        except Exception as e:
+            # Captura erro e cria resultado de falha
+            import traceback
+            tb_str = traceback.format_exc()
+            return ValidationResult(
+                category=check.name,
+                passed=False,
+                errors=[{
+                    "severity": Severity.BLOCKER.value,
+                    "message": f"Erro na execução do check: {str(e)}",
+                    "details": {
+                        "exception": str(type(e).__name__),
+                        "traceback": tb_str
+                    }
+                }],
+                warnings=[],
+                info=[]
+            )
+    
     @classmethod
     def from_manifest(cls, manifest_path: str) -> 'ValidationRunner':
         """Cria runner a partir de arquivo manifest."""
@@ -86,9 +185,16 @@ def run_validation(
     file_path: str,
     manifest_path: Optional[str] = None,
     skip_checks: Optional[List[str]] = None,
-    output_dir: Optional[str] = None
+    output_dir: Optional[str] = None,
+    stream: bool = False
 ) -> ValidationReport:
-    """Função de conveniência para executar validação."""
+    """
+    Função de conveniência para executar validação.
+    
+    Com `stream=True`, arquivos CSV são lidos em blocos e validados bloco a
+    bloco (ver `ValidationRunner.run_chunks`); outros formatos são carregados
+    inteiros, como no modo padrão.
+    """
     
     # Carregar config
     if manifest_path:
@@ -98,18 +204,27 @@ def run_validation(
     
     config.input_file = file_path
     
-    # Carregar dados
-    df = load_dataframe(file_path, config)
-    
-    # Criar runner e executar
+    # Criar runner
     runner = ValidationRunner(config=config, skip_checks=skip_checks)
+    
+    if stream and Path(file_path).suffix.lower() == '.csv':
+        return runner.run_chunks(iter_csv_chunks(file_path, config, runner.STREAM_CHUNK_ROWS))
+    
+    # Carregar dados e executar
+    df = load_dataframe(file_path, config)
     report = runner.run(df)
     
     return report
 
 
 def load_dataframe(file_path: str, config: ManifestConfig) -> pd.DataFrame:
-    """Carrega DataFrame a partir de arquivo."""
+    """
+    Carrega DataFrame a partir de arquivo.
+    
+    Usa os engines de `engines.py` (`pyarrow`/`calamine` quando disponíveis).
+    Com `pyarrow`, os dtypes inferidos podem diferir dos de `iter_csv_chunks`
+    (ex.: datas ISO já convertidas para `datetime64`).
+    """
     path = Path(file_path)
     
     if not path.exists():
@@ -122,13 +237,14 @@ def load_dataframe(file_path: str, config: ManifestConfig) -> pd.DataFrame:
         df = pd.read_excel(
             file_path,
             sheet_name=config.sheet_name or 0,
-            engine='openpyxl' if suffix == '.xlsx' else None
+            engine=excel_engine(suffix)
         )
     elif suffix == '.csv':
         df = pd.read_csv(
             file_path,
             encoding=config.encoding or 'utf-8',
-            sep=config.delimiter or ','
+            sep=config.delimiter or ',',
+            engine=csv_engine()
         )
     elif suffix == '.parquet':
         df = pd.read_parquet(file_path)
@@ -138,42 +254,53 @@ def load_dataframe(file_path: str, config: ManifestConfig) -> pd.DataFrame:
     return df
 
 
+def iter_csv_chunks(file_path: str, config: ManifestConfig, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Lê um CSV em blocos de `chunksize` linhas.
+    
+    O índice continua de um bloco para o outro, então os números de linha
+    reportados pelos checks são os do arquivo inteiro.
+    """
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    
+    # O engine pyarrow não lê em blocos; usa o parser C padrão, cuja inferência
+    # de tipos difere da do pyarrow (datas ISO continuam texto, por exemplo)
+    with pd.read_csv(
+        file_path,
+        encoding=config.encoding or 'utf-8',
+        sep=config.delimiter or ',',
+        chunksize=chunksize
+    ) as reader:
+        yield from reader
+
+
 def get_summary_stats(report: ValidationReport) -> Dict[str, Any]:
     """Extrai estatísticas resumidas do relatório."""
-    total_errors = 0
-    total_warnings = 0
-    total_info = 0
-    blocker_count = 0
-    major_count = 0
-    minor_count = 0
-    
-    for result in report.results:
-        total_errors += len(result.errors)
-        total_warnings += len(result.warnings)
-        total_info += len(result.info)
-        
-        for error in result.errors:
-            severity = error.severity if hasattr(error, 'severity') else error.get('severity', '')
-            if severity == Severity.BLOCKER or severity == 'BLOCKER':
-                blocker_count += 1
-            elif severity == Severity.MAJOR or severity == 'MAJOR':
-                major_count += 1
-            elif severity == Severity.MINOR or severity == 'MINOR':
-                minor_count += 1
+    total_errors = sum(len(result.errors) for result in report.results)
+    total_warnings = sum(len(result.warnings) for result in report.results)
+    total_info = sum(len(result.info) for result in report.results)
+    
+    # Severidades dos erros (ValidationError ou dict) contadas de uma vez
+    error_counts = Counter(
+        severity_name(error) for result in report.results for error in result.errors
+    )
     
     passed_checks = sum(1 for r in report.results if r.passed)
-    failed_checks = len(report.results) - passed_checks
+    skipped_checks = sum(1 for r in report.results if r.skipped)
+    failed_checks = len(report.results) - passed_checks - skipped_checks
     
     return {
         "passed": report.passed,
         "total_checks": len(report.results),
         "passed_checks": passed_checks,
         "failed_checks": failed_checks,
+        "skipped_checks": skipped_checks,
         "total_errors": total_errors,
         "total_warnings": total_warnings,
         "total_info": total_info,
-        "blocker_count": blocker_count,
-        "major_count": major_count,
-        "minor_count": minor_count,
+        "blocker_count": error_counts[Severity.BLOCKER.value],
+        "major_count": error_counts[Severity.MAJOR.value],
+        "minor_count": error_counts[Severity.MINOR.value],
         "execution_time": report.execution_time
     }